@@ -0,0 +1,68 @@
+# python ./analyze_data_bench.py [points]
+"""
+Cost of getting a large series into analyze_data: the JSON list path
+(encode, parse, validate as list[float], sum/len) against the packed base64
+path (encode, decode, full NumPy summary), and a memory-mapped .npy file.
+"""
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from pydantic import TypeAdapter
+
+import array_stats
+
+LIST_OF_FLOATS = TypeAdapter(list[float])
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def json_list_path(values):
+    payload = json.dumps({"data": values.tolist()})
+    data = LIST_OF_FLOATS.validate_python(json.loads(payload)["data"])
+    return len(payload), {"average": sum(data) / len(data), "count": len(data)}
+
+
+def packed_path(values):
+    payload = json.dumps({"packed": base64.b64encode(values.astype("<f8").tobytes()).decode()})
+    arr = array_stats.decode_packed(json.loads(payload)["packed"])
+    return len(payload), array_stats.summarize(arr)
+
+
+def npy_path(uri):
+    payload = json.dumps({"array_uri": uri})
+    return len(payload), array_stats.summarize(array_stats.load_array(uri))
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    values = np.random.default_rng(0).normal(size=points)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        array_stats.ARRAY_DIR = tmp
+        np.save(os.path.join(tmp, "series.npy"), values)
+
+        print(f"{points} points")
+        print(f"{'path':>24} {'payload bytes':>14} {'ms':>9}")
+        for name, fn in [
+            ("json list, mean only", lambda: json_list_path(values)),
+            ("packed float64, full", lambda: packed_path(values)),
+            ("array:// .npy, full", lambda: npy_path("array://series")),
+        ]:
+            seconds, (size, _) = timed(fn)
+            print(f"{name:>24} {size:>14} {seconds * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
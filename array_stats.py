@@ -0,0 +1,145 @@
+"""
+NumPy helpers behind context_demo.analyze_data.
+
+Besides a JSON list of floats, data can arrive as a base64 string of packed
+little-endian float64/float32 values, or as an array:// resource naming a
+.npy file that is memory-mapped rather than loaded.
+"""
+import base64
+import os
+import re
+
+import numpy as np
+
+DTYPES = {"float64": np.dtype("<f8"), "float32": np.dtype("<f4")}
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+# summarize() reads arrays CHUNK values at a time. Above EXACT_PERCENTILE_LIMIT
+# values, percentiles come from a FINE_BINS histogram instead of a sorted copy.
+CHUNK = 1 << 16
+EXACT_PERCENTILE_LIMIT = int(os.getenv("ARRAY_EXACT_PERCENTILE_LIMIT", 1_000_000))
+FINE_BINS = 1 << 14
+
+# array://<name> resolves to <ARRAY_DIR>/<name>.npy
+ARRAY_DIR = os.getenv("ARRAY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+_ARRAY_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def decode_packed(packed, dtype="float64"):
+    """Decode base64 packed floats into a read-only array (no copy)."""
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {sorted(DTYPES)}")
+    raw = base64.b64decode(packed, validate=True)
+    if len(raw) % DTYPES[dtype].itemsize:
+        raise ValueError(f"Packed data is not a whole number of {dtype} values")
+    return np.frombuffer(raw, dtype=DTYPES[dtype])
+
+
+def array_path(uri):
+    """Map an array://<name> URI to its .npy file."""
+    prefix = "array://"
+    name = uri[len(prefix):] if uri.startswith(prefix) else None
+    if not name or not _ARRAY_NAME.match(name) or name.startswith("."):
+        raise ValueError(f"Expected an array://<name> URI, got {uri!r}")
+    return os.path.join(ARRAY_DIR, f"{name}.npy")
+
+
+def load_array(uri):
+    """Memory-map the .npy file behind an array:// URI."""
+    arr = np.load(array_path(uri), mmap_mode="r", allow_pickle=False)
+    if not np.issubdtype(arr.dtype, np.number):
+        raise ValueError(f"{uri} does not hold numbers")
+    return arr.reshape(-1)
+
+
+def describe_array(uri):
+    """Shape and dtype of an array:// resource, read from the .npy header only."""
+    arr = np.load(array_path(uri), mmap_mode="r", allow_pickle=False)
+    return {"uri": uri, "shape": list(arr.shape), "dtype": str(arr.dtype), "size": int(arr.size)}
+
+
+def _moments(arr):
+    """Count, min, max, mean and M2 (sum of squared deviations) in one pass.
+
+    The array is read a chunk at a time; each chunk is small enough to stay in
+    cache while its min, max, mean and variance are taken, and the chunks are
+    combined with Chan's parallel update.
+    """
+    n, mean, m2 = 0, 0.0, 0.0
+    lo, hi = np.inf, -np.inf
+    for start in range(0, arr.size, CHUNK):
+        chunk = arr[start:start + CHUNK]
+        k = chunk.size
+        chunk_mean = float(chunk.mean(dtype=np.float64))
+        chunk_m2 = float(chunk.var(dtype=np.float64)) * k
+        lo, hi = min(lo, float(chunk.min())), max(hi, float(chunk.max()))
+        delta = chunk_mean - mean
+        total = n + k
+        mean += delta * k / total
+        m2 += chunk_m2 + delta * delta * n * k / total
+        n = total
+    return n, lo, hi, mean, m2
+
+
+def _histograms(arr, lo, hi, bins, fine_bins):
+    """The requested histogram and, if fine_bins, a fine one for percentiles,
+    both over [lo, hi] and filled in a second chunked pass."""
+    counts = np.zeros(bins, dtype=np.int64)
+    fine = np.zeros(fine_bins, dtype=np.int64) if fine_bins else None
+    edges = fine_edges = None
+    for start in range(0, arr.size, CHUNK):
+        chunk = arr[start:start + CHUNK]
+        chunk_counts, edges = np.histogram(chunk, bins=bins, range=(lo, hi))
+        counts += chunk_counts
+        if fine is not None:
+            chunk_fine, fine_edges = np.histogram(chunk, bins=fine_bins, range=(lo, hi))
+            fine += chunk_fine
+    return counts, edges, fine, fine_edges
+
+
+def _approximate_percentiles(fine, edges, n):
+    """Percentiles interpolated from a fine histogram; off by at most one bin width."""
+    cumulative = np.cumsum(fine)
+    values = []
+    for p in PERCENTILES:
+        rank = p / 100 * (n - 1)
+        i = int(np.searchsorted(cumulative, rank, side="right"))
+        i = min(i, len(fine) - 1)
+        before = cumulative[i - 1] if i else 0
+        within = (rank - before) / fine[i] if fine[i] else 0.0
+        values.append(edges[i] + (edges[i + 1] - edges[i]) * min(max(within, 0.0), 1.0))
+    return values
+
+
+def summarize(values, bins=10):
+    """Mean, variance, extremes, percentiles and a histogram of a 1-D array.
+
+    The data is read twice, a chunk at a time: once for the moments and
+    extremes, once for the histogram. Exact percentiles need a sorted copy of
+    the data, so they are only computed for arrays of up to
+    EXACT_PERCENTILE_LIMIT values (8 MiB of float64 by default); larger ones,
+    typically memory-mapped .npy files, get percentiles interpolated from a
+    FINE_BINS histogram, within (max - min) / FINE_BINS of the exact value.
+    """
+    arr = np.asarray(values).reshape(-1)
+    if arr.size == 0:
+        raise ValueError("Empty data list")
+    n, lo, hi, mean, m2 = _moments(arr)
+    variance = m2 / n
+    exact = n <= EXACT_PERCENTILE_LIMIT or lo == hi
+    counts, edges, fine, fine_edges = _histograms(arr, lo, hi, bins, 0 if exact else FINE_BINS)
+    if exact:
+        percentiles = np.percentile(arr, PERCENTILES)
+    else:
+        percentiles = _approximate_percentiles(fine, fine_edges, n)
+    return {
+        "count": n,
+        "average": mean,
+        "variance": variance,
+        "std": variance ** 0.5,
+        "min": lo,
+        "max": hi,
+        "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)},
+        "percentiles_exact": exact,
+        "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+    }
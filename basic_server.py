@@ -1,13 +1,18 @@
 # server.py
 from fastmcp import FastMCP
 
+from memoize import enable_memoization, memoize
+
 mcp = FastMCP("Demo 🚀")
 
 @mcp.tool()
+@memoize(maxsize=1024)
 def add(a: int, b: int) -> int:
     """Add two numbers"""
     return a + b
 
+enable_memoization(mcp)
+
 if __name__ == "__main__":
     mcp.run()
 
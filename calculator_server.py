@@ -1,17 +1,24 @@
 # server.py
 from fastmcp import FastMCP
 
+from memoize import enable_memoization, memoize
+
 # Create an MCP server
 mcp = FastMCP("Demo")
 
 # Add an addition tool
 @mcp.tool()
+@memoize(maxsize=1024)
 def add(a: int, b: int) -> int:
     """Add two numbers"""
     return a + b
 
 # Add a dynamic greeting resource
 @mcp.resource("greeting://{name}")
+@memoize(maxsize=1024)
 def get_greeting(name: str) -> str:
     """Get a personalized greeting"""
-    return f"Hello, {name}!"
\ No newline at end of file
+    return f"Hello, {name}!"
+
+# Serve the @memoize'd tool and resource above from cache
+enable_memoization(mcp)
@@ -0,0 +1,219 @@
+"""
+A pool of warm fastmcp Client sessions to one server.
+
+Opening a Client to a script spawns a Python subprocess and runs the MCP
+initialize handshake, which costs far more than a tool call. ClientPool opens
+``size`` sessions once and reuses them:
+
+    async with ClientPool("tinker_server.py", size=4) as pool:
+        await asyncio.gather(*(pool.call_tool("add", {"a": i, "b": 1}) for i in range(100)))
+
+Each call goes to the session with the fewest requests in flight. A session
+takes any number of concurrent requests (MCP matches responses by request
+id), so the pool multiplexes rather than locks. A background task pings every
+session every ``health_interval`` seconds and replaces any that died or
+stopped answering; a call that fails on a broken session also triggers a
+replacement, and is retried once on another session if it never got sent.
+
+Every session lives inside its own task, because anyio (used by the stdio
+and SSE transports) requires a connection to be closed by the task that
+opened it.
+"""
+import asyncio
+import logging
+
+import anyio
+from fastmcp import Client
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the session itself is gone, rather than the call failing
+_BROKEN = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, ConnectionError)
+# ...of which these are raised while sending, so the server never saw the
+# request and it is safe to retry on another session
+_NOT_SENT = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+class PoolClosedError(RuntimeError):
+    pass
+
+
+class _Slot:
+    """One pooled session, owned by its own task."""
+
+    def __init__(self, index, client):
+        self.index = index
+        self.client = client
+        self.inflight = 0
+        self.calls = 0
+        self.ready = asyncio.Event()
+        self.closing = asyncio.Event()
+        self.error = None
+        self.task = None
+
+    @property
+    def healthy(self):
+        return self.ready.is_set() and self.error is None and not self.task.done()
+
+    async def run(self):
+        try:
+            async with self.client:
+                self.ready.set()
+                await self.closing.wait()
+        except Exception as e:
+            self.error = e
+            self.ready.set()   # wake anyone waiting for startup
+
+
+class ClientPool:
+    def __init__(self, target=None, size=4, factory=None, health_interval=30.0, ping_timeout=5.0):
+        """``target`` is anything Client() accepts; pass ``factory`` instead
+        when each session needs its own transport object, e.g.
+        ``factory=lambda: Client(PythonStdioTransport("server.py"))``."""
+        if factory is None:
+            if target is None:
+                raise ValueError("ClientPool needs a target or a factory")
+            factory = lambda: Client(target)  # noqa: E731
+        self.factory = factory
+        self.size = size
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self._slots = []
+        self._health_task = None
+        self._tasks = set()   # pending replacements
+        self._closed = True
+        # metrics
+        self.calls = 0
+        self.respawns = 0
+        self.failures = 0
+
+    # Lifecycle
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        self._closed = False
+        self._slots = [self._spawn(i) for i in range(self.size)]
+        await asyncio.gather(*(slot.ready.wait() for slot in self._slots))
+        errors = [slot.error for slot in self._slots if slot.error is not None]
+        if len(errors) == len(self._slots):
+            await self.close()
+            raise errors[0]
+        if self.health_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for slot in self._slots:
+            slot.closing.set()
+        await asyncio.gather(*(slot.task for slot in self._slots), return_exceptions=True)
+        self._slots = []
+
+    def _spawn(self, index):
+        slot = _Slot(index, self.factory())
+        slot.task = asyncio.create_task(slot.run())
+        return slot
+
+    async def _replace(self, slot):
+        """Swap a broken slot for a fresh session."""
+        if self._closed or self._slots[slot.index] is not slot:
+            return  # already replaced, or shutting down
+        self.respawns += 1
+        logger.warning("Replacing pooled session %d: %s", slot.index, slot.error)
+        fresh = self._spawn(slot.index)
+        self._slots[slot.index] = fresh
+        slot.closing.set()
+        await asyncio.gather(slot.task, return_exceptions=True)
+        await fresh.ready.wait()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    async def check_health(self):
+        """Ping every session and replace the ones that don't answer."""
+        async def check(slot):
+            if not slot.ready.is_set():
+                return   # still starting up
+            if slot.healthy:
+                try:
+                    with anyio.fail_after(self.ping_timeout):
+                        await slot.client.ping()
+                    return
+                except Exception as e:
+                    slot.error = e
+            await self._replace(slot)
+
+        await asyncio.gather(*(check(slot) for slot in list(self._slots)))
+
+    # Calls
+
+    def _pick(self):
+        healthy = [slot for slot in self._slots if slot.healthy]
+        if not healthy:
+            raise PoolClosedError("no healthy sessions in the pool" if not self._closed else "pool is closed")
+        return min(healthy, key=lambda slot: (slot.inflight, slot.calls))
+
+    async def _run(self, method, *args, **kwargs):
+        if self._closed:
+            raise PoolClosedError("pool is closed")
+        for attempt in range(2):
+            slot = self._pick()
+            slot.inflight += 1
+            slot.calls += 1
+            self.calls += 1
+            try:
+                return await getattr(slot.client, method)(*args, **kwargs)
+            except _BROKEN as e:
+                self.failures += 1
+                if slot.error is None:
+                    slot.error = e
+                    self._background(self._replace(slot))
+                if attempt or not isinstance(e, _NOT_SENT):
+                    raise
+            finally:
+                slot.inflight -= 1
+
+    def _background(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def call_tool(self, name, arguments=None):
+        return await self._run("call_tool", name, arguments or {})
+
+    async def read_resource(self, uri):
+        return await self._run("read_resource", uri)
+
+    async def list_tools(self):
+        return await self._run("list_tools")
+
+    async def list_resources(self):
+        return await self._run("list_resources")
+
+    async def get_prompt(self, name, arguments=None):
+        return await self._run("get_prompt", name, arguments)
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "healthy": sum(slot.healthy for slot in self._slots),
+            "calls": self.calls,
+            "failures": self.failures,
+            "respawns": self.respawns,
+            "sessions": [
+                {"index": slot.index, "healthy": slot.healthy, "inflight": slot.inflight, "calls": slot.calls}
+                for slot in self._slots
+            ],
+        }
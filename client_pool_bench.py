@@ -0,0 +1,71 @@
+# python ./client_pool_bench.py
+"""
+Per-call latency of a tool call with and without a ClientPool.
+
+Unpooled, every call opens its own Client to the server script (subprocess
+spawn + MCP initialize), like client.py used to. Pooled, calls share POOL_SIZE
+warm stdio sessions, sequentially and then CONCURRENCY at a time.
+"""
+import asyncio
+import statistics
+import time
+
+from fastmcp import Client
+
+from client_pool import ClientPool
+
+SERVER = "basic_server.py"
+POOL_SIZE = 4
+UNPOOLED_CALLS = 10
+POOLED_CALLS = 500
+CONCURRENCY = 32
+
+
+def report(label, latencies, wall=None):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    line = f"{label:<24} {len(latencies):>6} calls  p50 {p50:9.2f} ms  p95 {p95:9.2f} ms"
+    if wall:
+        line += f"  {len(latencies) / wall:8.0f} calls/s"
+    print(line)
+
+
+async def timed(call):
+    start = time.perf_counter()
+    await call()
+    return time.perf_counter() - start
+
+
+async def main():
+    async def unpooled_call():
+        async with Client(SERVER) as client:
+            await client.call_tool("add", {"a": 1, "b": 2})
+
+    report("unpooled (spawn/call)", [await timed(unpooled_call) for _ in range(UNPOOLED_CALLS)])
+
+    start = time.perf_counter()
+    async with ClientPool(SERVER, size=POOL_SIZE) as pool:
+        print(f"{'pool warm-up':<24} {POOL_SIZE:>6} sessions {(time.perf_counter() - start) * 1000:9.0f} ms")
+
+        async def pooled_call(i=0):
+            await pool.call_tool("add", {"a": i, "b": 2})
+
+        start = time.perf_counter()
+        latencies = [await timed(pooled_call) for _ in range(POOLED_CALLS)]
+        report("pooled, sequential", latencies, time.perf_counter() - start)
+
+        limit = asyncio.Semaphore(CONCURRENCY)
+
+        async def bounded(i):
+            async with limit:
+                return await timed(lambda: pooled_call(i))
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(bounded(i) for i in range(POOLED_CALLS)))
+        report(f"pooled, {CONCURRENCY} in flight", latencies, time.perf_counter() - start)
+        print("calls per session:", [s["calls"] for s in pool.stats()["sessions"]])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,222 @@
+"""
+Coalescing wrapper around fastmcp.Context notifications.
+
+Every ``await ctx.info(...)`` or ``ctx.report_progress(...)`` is its own
+transport write. BatchingContext keeps the same methods but:
+
+- buffers log lines and sends them as one message per level, flushed after
+  ``flush_interval`` seconds or once ``max_buffer`` lines are waiting
+  (errors flush straight away)
+- sends progress at most once per ``min_progress_interval``, always keeping
+  the latest value and always sending completion
+- drops messages below the level the client asked for with logging/setLevel
+
+Decorate a tool with ``@coalesce_notifications`` (under ``@mcp.tool()``) to
+have its Context swapped for a BatchingContext that is flushed on return, and
+call ``track_log_level(mcp)`` once so client log levels are known.
+"""
+import asyncio
+import functools
+import inspect
+import time
+import weakref
+
+from fastmcp import Context
+
+LOG_LEVELS = ["debug", "info", "notice", "warning", "error", "critical", "alert", "emergency"]
+_RANK = {level: rank for rank, level in enumerate(LOG_LEVELS)}
+
+# Level each session asked for with logging/setLevel
+_session_levels = weakref.WeakKeyDictionary()
+
+
+def _low_level_server(mcp):
+    # FastMCP (2.5) has no public way to handle logging/setLevel, so the
+    # handler goes on the mcp.server.Server it wraps. Keep the private
+    # attribute access here so there is one place to change when it does.
+    return mcp._mcp_server
+
+
+def track_log_level(mcp):
+    """Record the log level each client sets, so BatchingContext can filter.
+
+    Call it on the server clients connect to: on a server mounted into
+    another one the handler is never reached.
+    """
+    server = _low_level_server(mcp)
+
+    @server.set_logging_level()
+    async def set_logging_level(level):
+        _session_levels[server.request_context.session] = level
+
+
+class BatchingContext:
+    """A Context stand-in that batches log and progress notifications."""
+
+    def __init__(
+        self,
+        ctx,
+        flush_interval=0.05,
+        max_buffer=50,
+        min_progress_interval=0.1,
+        default_level="info",
+    ):
+        self._ctx = ctx
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.min_progress_interval = min_progress_interval
+        try:
+            level = _session_levels.get(ctx.session, default_level)
+        except (ValueError, RuntimeError, TypeError):
+            level = default_level   # not inside a request
+        self._min_rank = _RANK.get(level, 0)
+
+        self._buffer = []            # (level, logger_name, message)
+        self._pending_progress = None
+        self._last_progress = 0.0
+        self._timer = None
+        self._flush_tasks = set()    # flushes started by the timer
+        self._flush_error = None
+        self._lock = asyncio.Lock()
+        # counters
+        self.log_lines = 0
+        self.log_writes = 0
+        self.dropped = 0
+        self.progress_updates = 0
+        self.progress_writes = 0
+
+    def __getattr__(self, name):
+        # Everything else (request_id, read_resource, sample, ...) is the real Context's
+        return getattr(self._ctx, name)
+
+    async def debug(self, message, logger_name=None):
+        await self.log(message, "debug", logger_name)
+
+    async def info(self, message, logger_name=None):
+        await self.log(message, "info", logger_name)
+
+    async def warning(self, message, logger_name=None):
+        await self.log(message, "warning", logger_name)
+
+    async def error(self, message, logger_name=None):
+        await self.log(message, "error", logger_name)
+
+    async def log(self, message, level=None, logger_name=None):
+        level = level or "info"
+        if _RANK.get(level, 0) < self._min_rank:
+            self.dropped += 1
+            return
+        self.log_lines += 1
+        self._buffer.append((level, logger_name, message))
+        if _RANK.get(level, 0) >= _RANK["error"] or len(self._buffer) >= self.max_buffer:
+            await self.flush()
+        else:
+            self._schedule(self.flush_interval)
+
+    async def report_progress(self, progress, total=None):
+        self.progress_updates += 1
+        self._pending_progress = (progress, total)
+        finished = total is not None and progress >= total
+        wait = self._last_progress + self.min_progress_interval - time.monotonic()
+        if finished or wait <= 0:
+            await self.flush()
+        else:
+            self._schedule(wait)
+
+    def _schedule(self, delay):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task):
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None and self._flush_error is None:
+            self._flush_error = task.exception()   # raised from aclose
+
+    async def flush(self):
+        """Send buffered log lines and the latest progress now."""
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            buffer, self._buffer = self._buffer, []
+            # One message per run of lines with the same level and logger
+            start = 0
+            for i in range(1, len(buffer) + 1):
+                if i == len(buffer) or buffer[i][:2] != buffer[start][:2]:
+                    level, logger_name, _ = buffer[start]
+                    message = "\n".join(line for _, _, line in buffer[start:i])
+                    await self._ctx.log(message, level=level, logger_name=logger_name)
+                    self.log_writes += 1
+                    start = i
+
+            if self._pending_progress is not None:
+                progress, total = self._pending_progress
+                self._pending_progress = None
+                self._last_progress = time.monotonic()
+                await self._ctx.report_progress(progress, total)
+                self.progress_writes += 1
+
+    async def aclose(self):
+        """Wait for timed flushes, send what is left and raise the first error
+        a timed flush hit."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+        if self._flush_error is not None:
+            error, self._flush_error = self._flush_error, None
+            raise error
+
+    def stats(self):
+        return {
+            "log_lines": self.log_lines,
+            "log_writes": self.log_writes,
+            "dropped": self.dropped,
+            "progress_updates": self.progress_updates,
+            "progress_writes": self.progress_writes,
+        }
+
+
+def coalesce_notifications(fn=None, **options):
+    """Run a tool with a BatchingContext in place of its Context.
+
+    Use below the registration decorator, optionally with BatchingContext
+    options:
+
+        @mcp.tool()
+        @coalesce_notifications(min_progress_interval=0.5)
+        async def my_tool(x: int, ctx: Context) -> str: ...
+    """
+    if fn is None:
+        return functools.partial(coalesce_notifications, **options)
+
+    signature = inspect.signature(fn)
+    ctx_name = next(
+        (name for name, param in signature.parameters.items() if param.annotation is Context),
+        None,
+    )
+    if ctx_name is None:
+        raise TypeError(f"{fn.__name__} has no Context parameter to batch")
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind_partial(*args, **kwargs)
+        ctx = bound.arguments.get(ctx_name)
+        if ctx is None:
+            return await fn(*args, **kwargs)
+        batched = BatchingContext(ctx, **options)
+        bound.arguments[ctx_name] = batched
+        try:
+            return await fn(*bound.args, **bound.kwargs)
+        finally:
+            await batched.aclose()
+
+    return wrapper
@@ -1,42 +1,113 @@
+import asyncio
+import os
+from typing import Literal
+
 from fastmcp import FastMCP, Context
 
+import dir_listing
+from context_batching import coalesce_notifications, track_log_level
+from doc_search import DocumentIndex
+from document_store import DocumentRegistry, FileContentCache
+from sentiment_batch import SentimentBatcher, SentimentCache
+
 mcp = FastMCP(name="ContextDemo")
+# Honour logging/setLevel, so tools below skip messages nobody asked for
+track_log_level(mcp)
+
+# Documents served as document:// resources. Small files are cached in memory
+# (revalidated by mtime and size on every read); large ones are streamed from
+# a memory map in chunks by the tools below.
+document_cache = FileContentCache(max_bytes=int(os.getenv("DOCUMENT_CACHE_BYTES", 64 * 1024 * 1024)))
+documents = DocumentRegistry(cache=document_cache)
+documents.add_text(
+    "document://sample",
+    "This is a sample document with some text content that can be summarized.",
+)
+documents.add_file("document://hello", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hello.txt"))
+
+# Inverted index over the documents above, kept on disk between restarts
+document_index = DocumentIndex(path=os.getenv("DOCUMENT_INDEX_PATH", ".document_index.json") or None)
+
+# Sentiment verdicts by content hash, shared by both sentiment tools
+sentiment_batcher = SentimentBatcher(
+    cache=SentimentCache(maxsize=int(os.getenv("SENTIMENT_CACHE_SIZE", 10_000))),
+    batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", 20)),
+)
+
+
+async def _iter_document(uri: str, ctx: Context):
+    """Yield (text, bytes_read, total_bytes) chunks of a document.
+
+    Registered documents are streamed chunk by chunk; any other resource URI
+    is read through the context in one go.
+    """
+    if uri in documents:
+        total = documents.size(uri)
+        async for text, done in documents.aiter_text(uri):
+            yield text, done, total
+        return
+
+    contents_list = await ctx.read_resource(uri)
+    if contents_list:
+        data = contents_list[0].content # Assuming TextResourceContents
+        yield data, len(data), len(data)
 
 
 @mcp.tool()
-async def show_files() -> list[str]:
-    """Lists all files in the current directory."""
-    import os
-    files = os.listdir(".")
-    return files
+async def show_files(
+    path: str = ".",
+    pattern: str | None = None,
+    recursive: bool = False,
+    cursor: str | None = None,
+    limit: int = dir_listing.DEFAULT_PAGE_SIZE,
+    include_stat: bool = True,
+) -> dict:
+    """Lists files in a directory under the current directory, a page at a time.
+
+    - pattern: glob on the file name, or on the relative path if it has a
+      "/" ("*" stays within one directory)
+    - recursive: walk subdirectories too
+    - cursor: the next_cursor from the previous page, with the same
+      path/pattern/recursive
+    - limit: page size, at most 1000
+    Returns {"entries": [{path, type, size, mtime}], "next_cursor"}.
+    """
+    try:
+        # scandir blocks, so keep it off the event loop
+        return await asyncio.to_thread(
+            dir_listing.list_page, path, pattern, recursive, cursor, limit, include_stat
+        )
+    except ValueError as e:
+        return {"error": str(e)}
 
 
 @mcp.tool()
+@coalesce_notifications
 async def process_file(file_uri: str, ctx: Context) -> str:
     """Processes a file, using context for logging and resource access."""
     request_id = ctx.request_id
     await ctx.info(f"[{request_id}] Starting processing for {file_uri}")
 
     try:
-        # Use context to read a resource
-        contents_list = await ctx.read_resource(file_uri)
-        if not contents_list:
-            await ctx.warning(f"Resource {file_uri} is empty.")
-            return "Resource empty"
+        # Stream the resource through the context a chunk at a time, so even
+        # very large files never sit in memory whole
+        read_bytes = 0
+        processed_length = 0
+        async for data, read_bytes, total in _iter_document(file_uri, ctx):
+            # Simulate work
+            processed_length += len(data.upper()) # Example processing
 
-        data = contents_list[0].content # Assuming TextResourceContents
-        await ctx.debug(f"Read {len(data)} bytes from {file_uri}")
+            # Report progress
+            await ctx.report_progress(progress=read_bytes, total=total)
 
-        # Report progress
-        await ctx.report_progress(progress=50, total=100)
-        
-        # Simulate work
-        processed_data = data.upper() # Example processing
+        if not read_bytes:
+            await ctx.warning(f"Resource {file_uri} is empty.")
+            return "Resource empty"
 
-        await ctx.report_progress(progress=100, total=100)
+        await ctx.debug(f"Read {read_bytes} bytes from {file_uri}")
         await ctx.info(f"Processing complete for {file_uri}")
 
-        return f"Processed data length: {len(processed_data)}"
+        return f"Processed data length: {processed_length}"
 
     except Exception as e:
         # Use context to log errors
@@ -45,34 +116,75 @@ async def process_file(file_uri: str, ctx: Context) -> str:
 
 
 @mcp.tool()
-async def analyze_data(data: list[float], ctx: Context) -> dict:
-    """Analyze numerical data with logging."""
+@coalesce_notifications
+async def analyze_data(
+    ctx: Context,
+    data: list[float] | None = None,
+    packed: str | None = None,
+    dtype: Literal["float64", "float32"] = "float64",
+    array_uri: str | None = None,
+    bins: int = 10,
+) -> dict:
+    """Analyze numerical data with logging.
+
+    Pass exactly one of:
+    - data: a JSON list of numbers
+    - packed: base64 of little-endian float64 (or float32, see dtype) values;
+      much cheaper than a JSON list for large series
+    - array_uri: an array://<name> resource for a .npy file, memory-mapped
+    Returns mean, variance, min/max, percentiles and a histogram.
+    """
+    import array_stats
+
     await ctx.debug("Starting analysis of numerical data")
-    await ctx.info(f"Analyzing {len(data)} data points")
-    
+
+    sources = [source for source in (data, packed, array_uri) if source is not None]
+    if len(sources) != 1:
+        return {"error": "Provide exactly one of data, packed or array_uri"}
+
     try:
-        result = sum(data) / len(data)
-        await ctx.info(f"Analysis complete, average: {result}")
-        return {"average": result, "count": len(data)}
-    except ZeroDivisionError:
-        await ctx.warning("Empty data list provided")
-        return {"error": "Empty data list"}
+        if packed is not None:
+            values = array_stats.decode_packed(packed, dtype)
+        elif array_uri is not None:
+            values = array_stats.load_array(array_uri)
+        else:
+            values = data
+        await ctx.info(f"Analyzing {len(values)} data points")
+
+        result = array_stats.summarize(values, bins=bins)
+        await ctx.info(f"Analysis complete, average: {result['average']}")
+        return result
+    except ValueError as e:
+        await ctx.warning(f"Invalid data: {e}")
+        return {"error": str(e)}
     except Exception as e:
         await ctx.error(f"Analysis failed: {str(e)}")
         raise
 
+@mcp.resource("array://{name}")
+def get_array_info(name: str) -> dict:
+    """Shape and dtype of a .npy array that analyze_data can read by URI."""
+    import array_stats
+    return array_stats.describe_array(f"array://{name}")
+
 @mcp.resource("document://sample")
 def get_sample_document() -> str:
-    return "This is a sample document with some text content that can be summarized."
+    return documents.read_text("document://sample")
 
 
 @mcp.resource("document://hello")
-def get_sample_document() -> str:
-    return open("./hello.txt", "r").read(-1)
-    # return "This is a sample document with some text content that can be summarized."
+def get_hello_document() -> str:
+    return documents.read_text("document://hello")
+
+
+@mcp.resource("cache://documents/stats")
+def get_document_cache_stats() -> dict:
+    """Hit, miss and eviction counters for the document file cache."""
+    return document_cache.stats()
 
 
 @mcp.tool()
+@coalesce_notifications
 async def summarize_document(document_uri: str, ctx: Context) -> str:    
     """Summarize a document by its resource URI.
     example: document://sample
@@ -82,51 +194,91 @@ async def summarize_document(document_uri: str, ctx: Context) -> str:
     # Example document URI
     # document_uri = "document://sample"
 
-    # Read the document content
-    content_list = await ctx.read_resource(document_uri)
-    
-    if not content_list:
+    # Stream the document: keep the first 100 words and count the rest
+    summary_words = []
+    full_text = []          # only kept while the document is short
+    total_words = 0
+    partial = ""            # a word cut in two by a chunk boundary
+    async for text, read_bytes, total in _iter_document(document_uri, ctx):
+        if total_words <= 100:
+            full_text.append(text)
+        text = partial + text
+        words = text.split()
+        partial = words.pop() if words and not text[-1].isspace() else ""
+        total_words += len(words)
+        if len(summary_words) < 100:
+            summary_words.extend(words[:100 - len(summary_words)])
+        await ctx.report_progress(progress=read_bytes, total=total)
+    if partial:
+        total_words += 1
+        if len(summary_words) < 100:
+            summary_words.append(partial)
+
+    if not total_words and not full_text:
         return "Document is empty"
     
-    document_text = content_list[0].content
-    
-    # Example: Generate a simple summary (length-based)
-    words = document_text.split()
-    total_words = len(words)
-    
     await ctx.info(f"Document has {total_words} words")
     
     # Return a simple summary
     if total_words > 100:
-        summary = " ".join(words[:100]) + "..."
+        summary = " ".join(summary_words) + "..."
         return f"Summary ({total_words} words total): {summary}"
     else:
-        return f"Full document ({total_words} words): {document_text}"
+        return f"Full document ({total_words} words): {''.join(full_text)}"
     
 
+@mcp.tool()
+async def search_documents(query: str, ctx: Context, limit: int = 10) -> dict:
+    """Search all document:// resources for words in the query.
+
+    Returns matching URIs ranked by relevance, each with a short snippet
+    around a match. Documents that changed since the last search are
+    re-indexed first; the rest are not read.
+    """
+    changed = await asyncio.to_thread(document_index.refresh, documents)
+    if changed:
+        await ctx.debug(f"Re-indexed {len(changed)} documents")
+    results = await asyncio.to_thread(document_index.search, documents, query, max(1, min(limit, 100)))
+    return {"query": query, "results": results}
+
+
+@mcp.resource("index://documents/stats")
+def get_document_index_stats() -> dict:
+    """Size of the document search index and how much of it was re-indexed."""
+    return document_index.stats()
+
+
 @mcp.tool()
 async def analyze_sentiment(text: str, ctx: Context) -> dict:
     """Analyze the sentiment of a text using the client's LLM."""
-    # Create a sampling prompt asking for sentiment analysis
-    prompt = f"Analyze the sentiment of the following text as positive, negative, or neutral. Just output a single word - 'positive', 'negative', or 'neutral'. Text to analyze: {text}"
-    
-    # Send the sampling request to the client's LLM
-    response = await ctx.sample(prompt)
-    
-    # Process the LLM's response
-    sentiment = response.text.strip().lower()
-    
-    # Map to standard sentiment values
-    if "positive" in sentiment:
-        sentiment = "positive"
-    elif "negative" in sentiment:
-        sentiment = "negative"
-    else:
-        sentiment = "neutral"
-    
+    # Repeat texts are answered from the verdict cache without sampling
+    sentiment = await sentiment_batcher.classify_one(text, ctx.sample)
     return {"text": text, "sentiment": sentiment}
 
 
+@mcp.tool()
+async def analyze_sentiment_batch(texts: list[str], ctx: Context) -> dict:
+    """Analyze the sentiment of many texts using the client's LLM.
+
+    Texts are packed into a few sampling requests rather than one each, and
+    texts seen before are answered from cache.
+    """
+    verdicts, requests = await sentiment_batcher.classify(texts, ctx.sample)
+    return {
+        "results": [
+            {"text": text, "sentiment": sentiment, "cached": cached}
+            for text, (sentiment, cached) in zip(texts, verdicts)
+        ],
+        "sampling_requests": requests,
+    }
+
+
+@mcp.resource("cache://sentiment/stats")
+def get_sentiment_cache_stats() -> dict:
+    """Hit rate of the sentiment verdict cache and sampling requests made."""
+    return sentiment_batcher.stats()
+
+
 
 @mcp.tool()
 async def request_info(ctx: Context) -> dict:
@@ -0,0 +1,174 @@
+"""
+Paginated directory listing for context_demo.show_files.
+
+Built on os.scandir, so types come straight from the directory entries and
+stat fields come from DirEntry.stat(), which is cached per entry (one lstat
+at most, none for the type). Calls are blocking; run them in a worker thread.
+
+Listing is stateless between pages. Entries come in name order (walking
+depth first when recursive) and the opaque cursor holds the path of the last
+one returned, so the next page starts right after it however the directory
+changed in between: nothing is skipped or repeated because of entries added
+or removed elsewhere, and the cursor never grows past that one path. A page
+reads each directory it visits once, keeps the names past the cursor that
+the pattern lists or needs to walk into, and sorts those; it makes no stat
+calls for entries it doesn't return. Paths are confined to the base
+directory.
+"""
+import base64
+import fnmatch
+import json
+import os
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def _encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after = state["after"]
+        # plain names only, so resuming can't step outside the listing
+        if not isinstance(after, list) or not after or not all(
+            isinstance(name, str) and name not in ("", ".", "..") and os.sep not in name
+            for name in after
+        ):
+            raise ValueError
+        return state
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("cursor is invalid")
+
+
+def _confined(base, rel):
+    """Absolute path of rel under base, refusing anything that escapes it."""
+    full = os.path.realpath(os.path.join(base, rel))
+    if full != base and not full.startswith(base + os.sep):
+        raise ValueError(f"{rel!r} is outside the listing root")
+    return full
+
+
+def _entry_type(entry):
+    if entry.is_symlink():
+        return "symlink"
+    if entry.is_dir(follow_symlinks=False):
+        return "dir"
+    if entry.is_file(follow_symlinks=False):
+        return "file"
+    return "other"
+
+
+def _is_dir(path):
+    return os.path.isdir(path) and not os.path.islink(path)
+
+
+def _selector(pattern, recursive):
+    """Return select(name, kind, depth) -> (list it, descend into it).
+
+    A pattern without "/" is matched against names at any depth. One with
+    "/" is matched a segment at a time from the listing root, so "*" never
+    crosses a directory ("d1/*.txt" is only files directly in d1), and only
+    directories matching the leading segments are walked.
+    """
+    segments = pattern.split("/") if pattern is not None and "/" in pattern else None
+
+    def select(name, kind, depth):
+        is_dir = recursive and kind == "dir"
+        if segments is None:
+            return pattern is None or fnmatch.fnmatch(name, pattern), is_dir
+        if depth >= len(segments) or not fnmatch.fnmatch(name, segments[depth]):
+            return False, False
+        if depth == len(segments) - 1:
+            return True, False
+        return False, is_dir
+
+    return select
+
+
+def _entries_after(full, after, select, depth):
+    """The entries of directory full named after ``after`` (None for all of
+    them) that select() lists or descends into, in name order, each with
+    whether to list it and whether to descend. Reads the directory once."""
+    chosen = []
+    try:
+        with os.scandir(full) as scan:
+            for entry in scan:
+                if after is not None and entry.name <= after:
+                    continue
+                emit, descend = select(entry.name, _entry_type(entry), depth)
+                if emit or descend:
+                    chosen.append((entry.name, entry, emit, descend))
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return []   # vanished or unreadable
+    chosen.sort(key=lambda item: item[0])
+    return [item[1:] for item in chosen]
+
+
+def _walk(root, rel_dir, resume, select, depth=0):
+    """Yield (relative path, DirEntry) for the entries to list under rel_dir,
+    in name order, depth first, starting after the path ``resume`` (a list of
+    names; empty to start at the beginning)."""
+    full = _confined(root, rel_dir)
+    if resume:
+        # the rest of the subdirectory we stopped in (or all of it, if we
+        # stopped on the directory itself) comes before its next sibling
+        name = resume[0]
+        sub = os.path.join(rel_dir, name) if rel_dir else name
+        if _is_dir(os.path.join(full, name)):
+            _, descend = select(name, "dir", depth)
+            if descend or len(resume) > 1:
+                yield from _walk(root, sub, resume[1:], select, depth + 1)
+    for entry, emit, descend in _entries_after(full, resume[0] if resume else None, select, depth):
+        rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+        if emit:
+            yield rel, entry
+        if descend:
+            yield from _walk(root, rel, [], select, depth + 1)
+
+
+def list_page(path=".", pattern=None, recursive=False, cursor=None, limit=DEFAULT_PAGE_SIZE,
+              with_stat=True, base="."):
+    """List one page of entries under path.
+
+    Returns {"entries": [...], "next_cursor": str | None}. Entries have a
+    path relative to ``path``, a type, and size/mtime when with_stat is set.
+    ``pattern`` is a glob matched against the name, or, if it contains a
+    "/", against the relative path one segment at a time ("*" doesn't match
+    across a "/"). Pass the returned cursor back, with the same
+    path/pattern/recursive, to get the next page.
+    """
+    base = os.path.realpath(base)
+    root = _confined(base, path)
+    if not os.path.isdir(root):
+        raise ValueError(f"{path!r} is not a directory")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = [path, pattern, bool(recursive)]
+
+    if cursor:
+        state = _decode_cursor(cursor)
+        if state.get("query") != query:
+            raise ValueError("cursor belongs to a different listing")
+        resume = state["after"]
+    else:
+        resume = []
+
+    entries = []
+    for rel, entry in _walk(root, "", resume, _selector(pattern, recursive)):
+        item = {"path": rel, "type": _entry_type(entry)}
+        if with_stat:
+            try:
+                st = entry.stat(follow_symlinks=False)
+                item["size"] = st.st_size
+                item["mtime"] = st.st_mtime
+            except OSError:
+                item["size"] = item["mtime"] = None
+        entries.append(item)
+
+        if len(entries) >= limit:
+            state = {"query": query, "after": rel.split(os.sep)}
+            return {"entries": entries, "next_cursor": _encode_cursor(state)}
+
+    return {"entries": entries, "next_cursor": None}
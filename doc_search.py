@@ -0,0 +1,219 @@
+"""
+Full-text search over the documents in a DocumentRegistry.
+
+DocumentIndex keeps an inverted index (term -> {uri: term frequency and the
+first few byte offsets}) and ranks matches with BM25. refresh() compares
+each document's signature (mtime and size for files, a content hash for
+in-memory text) with the indexed one and re-tokenizes only documents that
+changed, streaming them chunk by chunk. Snippets are read back from the
+stored offsets, so a search never reads a whole document.
+
+The index is saved as JSON after each refresh that changed something and
+loaded at startup, so restarts only re-index what changed while down.
+"""
+import json
+import math
+import os
+import re
+import threading
+
+# Word bytes: ASCII letters/digits/underscore plus any non-ASCII byte, so
+# UTF-8 encoded words stay whole and offsets stay in bytes
+_RAW_TOKEN = re.compile(rb"[A-Za-z0-9_\x80-\xff]+")
+_WORD = re.compile(r"\w+")
+
+MAX_OFFSETS = 8          # offsets kept per term per document, for snippets
+SNIPPET_BYTES = 160
+INDEX_VERSION = 1
+
+
+def _tokens(chunk, base):
+    """Yield (term, byte_offset) for the words in a bytes chunk."""
+    for match in _RAW_TOKEN.finditer(chunk):
+        raw = match.group()
+        if raw.isascii():
+            yield raw.decode().lower(), base + match.start()
+            continue
+        # Non-ASCII run: may hold punctuation such as curly quotes
+        text = raw.decode("utf-8", errors="ignore")
+        for word in _WORD.finditer(text):
+            offset = len(text[:word.start()].encode())
+            yield word.group().lower(), base + match.start() + offset
+
+
+def tokenize_query(query):
+    return [term for term, _ in _tokens(query.encode("utf-8"), 0)]
+
+
+class DocumentIndex:
+    def __init__(self, path=None, k1=1.2, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._docs = {}       # uri -> {"signature", "length", "terms": {term: [tf, offsets]}}
+        self._postings = {}   # term -> {uri: [tf, offsets]}
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self.reindexed = 0
+        self.loaded = 0
+        if path:
+            self._load()
+
+    # Building
+
+    def _index_document(self, registry, uri):
+        terms = {}
+        length = 0
+        base = 0
+        carry = b""
+        for chunk in registry.iter_chunks(uri):
+            data = carry + chunk
+            start = base - len(carry)
+            # Hold back a word that runs into the end of the chunk
+            cut = len(data)
+            match = re.search(rb"[A-Za-z0-9_\x80-\xff]+\Z", data)
+            if match:
+                cut = match.start()
+            for term, offset in _tokens(data[:cut], start):
+                length += 1
+                entry = terms.get(term)
+                if entry is None:
+                    terms[term] = [1, [offset]]
+                else:
+                    entry[0] += 1
+                    if len(entry[1]) < MAX_OFFSETS:
+                        entry[1].append(offset)
+            carry = data[cut:]
+            base += len(chunk)
+        for term, offset in _tokens(carry, base - len(carry)):
+            length += 1
+            entry = terms.setdefault(term, [0, []])
+            entry[0] += 1
+            if len(entry[1]) < MAX_OFFSETS:
+                entry[1].append(offset)
+        return {"length": length, "terms": terms}
+
+    def _add(self, uri, doc):
+        self._docs[uri] = doc
+        self._total_length += doc["length"]
+        for term, entry in doc["terms"].items():
+            self._postings.setdefault(term, {})[uri] = entry
+
+    def _remove(self, uri):
+        doc = self._docs.pop(uri, None)
+        if doc is None:
+            return
+        self._total_length -= doc["length"]
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(uri, None)
+                if not postings:
+                    del self._postings[term]
+
+    def refresh(self, registry):
+        """Bring the index up to date with the registry; returns URIs re-indexed."""
+        with self._lock:
+            changed = []
+            current = set(registry.uris())
+            for uri in current:
+                try:
+                    signature = registry.signature(uri)
+                except OSError:
+                    continue   # file gone; dropped below
+                doc = self._docs.get(uri)
+                if doc is not None and doc["signature"] == signature:
+                    continue
+                new_doc = self._index_document(registry, uri)
+                new_doc["signature"] = signature
+                self._remove(uri)
+                self._add(uri, new_doc)
+                changed.append(uri)
+
+            for uri in list(self._docs):
+                if uri not in current or not self._exists(registry, uri):
+                    self._remove(uri)
+                    changed.append(uri)
+
+            self.reindexed += len(changed)
+            if changed and self.path:
+                self._save()
+            return changed
+
+    @staticmethod
+    def _exists(registry, uri):
+        path = registry.path(uri)
+        return path is None or os.path.exists(path)
+
+    # Persistence
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "docs": self._docs}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("version") != INDEX_VERSION:
+            return
+        for uri, doc in saved.get("docs", {}).items():
+            self._add(uri, doc)
+        self.loaded = len(self._docs)
+
+    # Querying
+
+    def search(self, registry, query, limit=10):
+        """Rank documents for query; returns [{uri, score, snippet}]."""
+        terms = list(dict.fromkeys(tokenize_query(query)))
+        with self._lock:
+            if not terms or not self._docs:
+                return []
+            n = len(self._docs)
+            avg_length = self._total_length / n or 1
+            scores = {}
+            best = {}   # uri -> (document frequency, offset) of its rarest matching term
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for uri, (tf, offsets) in postings.items():
+                    length = self._docs[uri]["length"]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[uri] = scores.get(uri, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    if uri not in best or df < best[uri][0]:
+                        best[uri] = (df, offsets[0])
+            ranked = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+        return [
+            {"uri": uri, "score": round(score, 4), "snippet": self._snippet(registry, uri, best[uri][1])}
+            for uri, score in ranked
+        ]
+
+    @staticmethod
+    def _snippet(registry, uri, offset):
+        start = max(0, offset - SNIPPET_BYTES // 2)
+        try:
+            raw = registry.read_range(uri, start, start + SNIPPET_BYTES)
+        except (OSError, KeyError):
+            return ""
+        text = " ".join(raw.decode("utf-8", errors="ignore").split())
+        more = len(raw) == SNIPPET_BYTES
+        return ("..." if start else "") + text + ("..." if more else "")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "tokens": self._total_length,
+                "reindexed": self.reindexed,
+                "loaded_from_disk": self.loaded,
+                "path": self.path,
+            }
@@ -0,0 +1,182 @@
+"""
+Document storage for the document:// resources in context_demo.py.
+
+Documents are registered by URI, either as an in-memory string or as a file
+on disk. File documents are read through a memory map in fixed-size chunks,
+so tools can stream through multi-GB files without holding them in memory.
+
+Small files are kept in a FileContentCache instead: repeated reads cost a
+stat() call and are served from memory until the file's mtime or size
+changes.
+"""
+import asyncio
+import codecs
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileContentCache:
+    """LRU cache of file contents under a total byte budget.
+
+    Each entry is stamped with the file's mtime and size and revalidated with
+    a stat() on every read. Files larger than ``max_entry_bytes`` are never
+    cached; they are better streamed.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4 if max_entry_bytes is None else max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()   # path -> (mtime_ns, size, data)
+        self._lock = threading.Lock()
+
+    def cacheable(self, path):
+        return os.path.getsize(path) <= self.max_entry_bytes
+
+    def read_bytes(self, path):
+        """Return the file's contents, from memory if it hasn't changed."""
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                mtime_ns, size, data = entry
+                if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return data
+                self.stale += 1
+                self._discard(path)
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) <= self.max_entry_bytes:
+            with self._lock:
+                self._discard(path)
+                self._entries[path] = (st.st_mtime_ns, st.st_size, data)
+                self._bytes += len(data)
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+                    self.evictions += 1
+        return data
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry[2])
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "files": list(self._entries),
+            }
+
+
+class DocumentRegistry:
+    def __init__(self, cache=None):
+        self._files = {}   # uri -> path
+        self._texts = {}   # uri -> bytes
+        self.cache = cache
+
+    def add_file(self, uri, path):
+        self._files[uri] = path
+
+    def add_text(self, uri, text):
+        self._texts[uri] = text.encode("utf-8")
+
+    def __contains__(self, uri):
+        return uri in self._files or uri in self._texts
+
+    def uris(self):
+        return [*self._texts, *self._files]
+
+    def path(self, uri):
+        """The file backing a document, or None for in-memory documents."""
+        return self._files.get(uri)
+
+    def size(self, uri):
+        """Size of the document in bytes."""
+        if uri in self._texts:
+            return len(self._texts[uri])
+        return os.path.getsize(self._files[uri])
+
+    def signature(self, uri):
+        """Changes whenever the document's contents may have changed."""
+        if uri in self._texts:
+            return hashlib.blake2b(self._texts[uri], digest_size=16).hexdigest()
+        st = os.stat(self._files[uri])
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
+    def read_range(self, uri, start, end):
+        """Read bytes [start, end) of a document without loading the rest."""
+        if uri in self._texts:
+            return self._texts[uri][start:end]
+        with open(self._files[uri], "rb") as f:
+            f.seek(start)
+            return f.read(max(0, end - start))
+
+    def read_text(self, uri):
+        """Read a whole document as a string."""
+        if uri in self._texts:
+            return self._texts[uri].decode("utf-8")
+        path = self._files[uri]
+        if self.cache is not None:
+            return self.cache.read_bytes(path).decode("utf-8")
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def iter_chunks(self, uri, chunk_size=CHUNK_SIZE):
+        """Yield the document's bytes in chunks of at most chunk_size."""
+        path = self._files.get(uri)
+        if path is None or (self.cache is not None and self.cache.cacheable(path)):
+            data = self._texts[uri] if path is None else self.cache.read_bytes(path)
+            for offset in range(0, len(data), chunk_size):
+                yield data[offset:offset + chunk_size]
+            return
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return  # empty files can't be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, len(mm), chunk_size):
+                    yield mm[offset:offset + chunk_size]
+
+    def iter_text(self, uri, chunk_size=CHUNK_SIZE):
+        """Yield (text, bytes_read) pairs, decoding UTF-8 across chunk boundaries."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        done = 0
+        for chunk in self.iter_chunks(uri, chunk_size):
+            done += len(chunk)
+            yield decoder.decode(chunk), done
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail, done
+
+    async def aiter_text(self, uri, chunk_size=CHUNK_SIZE):
+        """Async version of iter_text; each chunk is read in a worker thread."""
+        chunks = self.iter_text(uri, chunk_size)
+        while True:
+            item = await asyncio.to_thread(next, chunks, None)
+            if item is None:
+                return
+            yield item
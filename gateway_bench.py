@@ -0,0 +1,152 @@
+# python ./gateway_bench.py
+"""
+The gateway (main.py) against running each demo server as its own process.
+
+For every server that imports here, spawn it alone over stdio and record
+the time to connect (spawn + initialize), the p50 of one representative
+call and the process RSS. Then spawn the gateway once and make the same
+calls through it, under their prefixed names. Last, in memory (no
+transport at all), compare a call straight to each server with the same
+call routed through the gateway's mount, which is the in-process cost of
+the extra hop.
+
+The Pet Store API and OpenWeather are the offline stand-ins from
+mcp_bench.py.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from mcp_bench import add_bench_rss, start_standins
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CALLS = 200
+
+# prefix -> (kind, name, arguments or URI), named as on the server itself
+WORKLOAD = {
+    "tinker": ("tool", "add", {"a": 1, "b": 2}),
+    "context": ("resource", "document://hello", None),
+    "calc": ("tool", "add", {"a": 1, "b": 2}),
+    "greet": ("tool", "greet", {"name": "Ford"}),
+    "petstore": ("tool", "listPets", {"limit": 5}),
+    "weather": ("tool", "get_current_weather", {"city": "Paris"}),
+}
+
+
+def prefixed(prefix, kind, name):
+    """The name of a call once mounted under ``prefix``."""
+    if kind == "tool":
+        return f"{prefix}_{name}"
+    protocol, path = name.split("://", 1)
+    return f"{protocol}://{prefix}/{path}"
+
+
+def serve(which):
+    """Run one server, or the gateway, over stdio (in the child process)."""
+    if which == "gateway":
+        import main
+        server = main.mcp
+    else:
+        import importlib
+        from main import SERVERS
+        server = importlib.import_module(SERVERS[which]).mcp
+
+    add_bench_rss(server).run("stdio")
+
+
+async def call(client, kind, name, args):
+    if kind == "tool":
+        return await client.call_tool(name, args)
+    return await client.read_resource(name)
+
+
+async def p50(client, kind, name, args):
+    await call(client, kind, name, args)   # warm up caches and connections
+    times = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        await call(client, kind, name, args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+async def over_stdio(which, calls):
+    """Connect time, {prefix: call p50} and RSS for one subprocess."""
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    transport = PythonStdioTransport(
+        os.path.join(HERE, "gateway_bench.py"), args=["--serve", which],
+        env=dict(os.environ), cwd=HERE, python_cmd=sys.executable,
+    )
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        connect = (time.perf_counter() - start) * 1000
+        latencies = {prefix: await p50(client, *call_args) for prefix, call_args in calls.items()}
+        rss = float((await client.call_tool("bench_rss", {}))[0].text)
+    return connect, latencies, rss
+
+
+async def in_memory(servers, gateway):
+    """{prefix: (direct p50, through the gateway p50)} with no transport."""
+    from fastmcp import Client
+
+    results = {}
+    async with Client(gateway) as through:
+        for prefix, server in servers.items():
+            kind, name, args = WORKLOAD[prefix]
+            async with Client(server) as direct:
+                results[prefix] = (
+                    await p50(direct, kind, name, args),
+                    await p50(through, kind, prefixed(prefix, kind, name), args),
+                )
+    return results
+
+
+async def run():
+    weather = await start_standins()
+    os.environ.setdefault("OPENAPI_MANIFEST_DIR", tempfile.mkdtemp(prefix="mcp-manifests-"))
+    try:
+        import main
+        servers, skipped = main.load_servers()
+        for prefix, error in skipped.items():
+            print(f"skipping {prefix}: {error}")
+
+        print(f"\n{'server':<10} {'connect ms':>11} {'call p50 ms':>12} {'rss MiB':>8}")
+        separate = {}
+        for prefix in servers:
+            connect, latencies, rss = await over_stdio(prefix, {prefix: WORKLOAD[prefix]})
+            separate[prefix] = (connect, latencies[prefix], rss)
+            print(f"{prefix:<10} {connect:>11.0f} {latencies[prefix]:>12.2f} {rss:>8.1f}")
+        total_connect = sum(connect for connect, _, _ in separate.values())
+        total_rss = sum(rss for _, _, rss in separate.values())
+        print(f"{'total':<10} {total_connect:>11.0f} {'':>12} {total_rss:>8.1f}")
+
+        gateway_calls = {
+            prefix: (kind, prefixed(prefix, kind, name), args)
+            for prefix, (kind, name, args) in WORKLOAD.items() if prefix in servers
+        }
+        connect, latencies, rss = await over_stdio("gateway", gateway_calls)
+        print(f"\ngateway    {connect:>11.0f} {'':>12} {rss:>8.1f}")
+        for prefix, latency in latencies.items():
+            print(f"  {prefix:<8} {'':>11} {latency:>12.2f}   (alone: {separate[prefix][1]:.2f})")
+        print(
+            f"\nsaved: {total_rss - rss:.1f} MiB RSS ({(1 - rss / total_rss) * 100:.0f}%), "
+            f"{total_connect - connect:.0f} ms of connecting, {len(servers) - 1} processes"
+        )
+
+        print(f"\nin memory    {'direct p50 ms':>14} {'via gateway p50 ms':>19}")
+        for prefix, (direct, through) in (await in_memory(servers, main.mcp)).items():
+            print(f"  {prefix:<10} {direct:>14.3f} {through:>19.3f}")
+    finally:
+        await weather.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:
+        serve(sys.argv[2])
+    else:
+        asyncio.run(run())
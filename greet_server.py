@@ -18,11 +18,16 @@
 
 from fastmcp import FastMCP, Client
 
+from memoize import enable_memoization, memoize
+
 mcp = FastMCP("My MCP Server")
 
 @mcp.tool()
+@memoize(maxsize=1024)
 def greet(name: str) -> str:
     return f"Hello, {name}!"
 
+enable_memoization(mcp)
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Conditional-request cache for httpx.
+
+Wrap an httpx transport in ETagCacheTransport and every GET that comes back
+with an ETag is remembered. The next GET for the same URL is sent with
+If-None-Match; if the server answers 304 the cached body is replayed as a
+normal 200, so callers never see the difference.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import httpx
+
+
+@dataclass
+class _CachedResponse:
+    etag: str
+    status_code: int
+    headers: list
+    body: bytes
+
+
+class ETagCacheTransport(httpx.AsyncBaseTransport):
+    """An httpx transport that revalidates cached GET responses by ETag."""
+
+    def __init__(self, transport=None, max_entries=1024):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self.max_entries = max_entries
+        self.hits = 0       # answered from the cache after a 304
+        self.misses = 0     # full responses from the server
+        self._entries = OrderedDict()
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    async def handle_async_request(self, request):
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        key = str(request.url)
+        cached = self._entries.get(key)
+        if cached is not None and "if-none-match" not in request.headers:
+            request.headers["If-None-Match"] = cached.etag
+
+        response = await self._transport.handle_async_request(request)
+
+        if response.status_code == 304 and cached is not None:
+            await response.aclose()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return httpx.Response(
+                cached.status_code,
+                headers=cached.headers,
+                content=cached.body,
+                request=request,
+                extensions=response.extensions,
+            )
+
+        etag = response.headers.get("etag")
+        if response.status_code != 200 or not etag or etag.startswith("W/"):
+            return response
+
+        # Read the raw (still encoded) body so it can be replayed byte for byte
+        try:
+            body = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        self.misses += 1
+        self._entries[key] = _CachedResponse(etag, 200, response.headers.multi_items(), body)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return httpx.Response(
+            200,
+            headers=response.headers,
+            content=body,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -1,5 +1,161 @@
+# python ./main.py                              (stdio)
+# python ./main.py --transport sse --port 8000
+"""
+One FastMCP gateway for all the demo servers, in a single process.
+
+Every server in SERVERS is imported and mounted under its prefix, so
+calculator_server's add is calc_add and tinker_server's is tinker_add;
+resources get the prefix as the first path segment (greeting://calc/Ford).
+Set GATEWAY_SERVERS=calc,greet to mount only some of them.
+
+Servers are mounted directly rather than as proxies, so a call is routed
+to the mounted server's tool manager in-process, without another MCP
+session or another round of JSON encoding. FastMCP would proxy the servers
+that have a lifespan (tinker, weather) in order to run it, so the gateway
+runs theirs instead: once per process, from the first session to the end of
+the last, rather than once per session as FastMCP runs its own lifespan
+(over SSE every client would otherwise start its own quote refresher and
+close the HTTP clients the others still use).
+
+Clients set their log level with logging/setLevel on the gateway, so that
+is where track_log_level is registered; a mounted server's own handler is
+never reached.
+
+A server that fails to import (weather_server without OPENWEATHER_API_KEY,
+for instance) is left out with a warning rather than taking the gateway
+down; gateway://status lists what was mounted and what wasn't.
+gateway_bench.py compares the gateway with running the servers one process
+each.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import traceback
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from fastmcp import FastMCP
+
+from context_batching import track_log_level
+from process_stats import rss_mb
+
+# prefix -> module defining ``mcp``
+SERVERS = {
+    "tinker": "tinker_server",
+    "context": "context_demo",
+    "calc": "calculator_server",
+    "greet": "greet_server",
+    "petstore": "petstore_server",
+    "weather": "weather_server",
+}
+
+
+def load_servers(prefixes=None):
+    """Import the servers; returns ({prefix: server}, {prefix: error})."""
+    servers, skipped = {}, {}
+    for prefix in prefixes or SERVERS:
+        try:
+            servers[prefix] = importlib.import_module(SERVERS[prefix]).mcp
+        except Exception as e:
+            skipped[prefix] = f"{type(e).__name__}: {e}"
+            print(f"gateway: not mounting {prefix} ({skipped[prefix]})", file=sys.stderr)
+            if os.getenv("GATEWAY_DEBUG"):
+                traceback.print_exc()
+    return servers, skipped
+
+
+class SharedLifespans:
+    """The lifespans of the mounted servers (quote refresher, HTTP clients...),
+    entered when the first session starts and exited when the last one ends.
+
+    They run in a task of their own, since anyio wants a cancel scope or task
+    group left by the task that entered it, and the last session to end is
+    seldom the first one.
+    """
+
+    def __init__(self, servers):
+        self.servers = servers
+        self.sessions = 0
+        self._lock = asyncio.Lock()
+        self._stop = None
+        self._task = None
+
+    async def _run(self, ready):
+        async with AsyncExitStack() as stack:
+            for server in self.servers.values():
+                # the wrapped lifespan only lives on the low-level server
+                low_level = server._mcp_server
+                await stack.enter_async_context(low_level.lifespan(low_level))
+            ready.set_result(None)
+            await self._stop.wait()
+
+    @asynccontextmanager
+    async def __call__(self, gateway):
+        async with self._lock:
+            if self.sessions == 0:
+                self._stop = asyncio.Event()
+                ready = asyncio.get_running_loop().create_future()
+                self._task = asyncio.create_task(self._run(ready))
+                await asyncio.wait([ready, self._task], return_when=asyncio.FIRST_COMPLETED)
+                if self._task.done():
+                    self._task.result()   # a lifespan failed to start
+            self.sessions += 1
+        try:
+            yield
+        finally:
+            async with self._lock:
+                self.sessions -= 1
+                if self.sessions == 0:
+                    self._stop.set()
+                    # shielded so a cancelled session still lets them finish
+                    await asyncio.shield(self._task)
+
+
+def create_gateway(prefixes=None):
+    servers, skipped = load_servers(prefixes)
+
+    gateway = FastMCP("Gateway", lifespan=SharedLifespans(servers))
+    track_log_level(gateway)
+    for prefix, server in servers.items():
+        gateway.mount(prefix, server, as_proxy=False)
+
+    @gateway.resource("gateway://status")
+    async def get_status() -> dict:
+        """Mounted servers with their tool counts, servers that failed to load, and process memory."""
+        mounted = {}
+        for prefix, server in servers.items():
+            mounted[prefix] = {
+                "module": SERVERS[prefix],
+                "name": server.name,
+                "tools": len(await server.get_tools()),
+            }
+        return {"mounted": mounted, "skipped": skipped, "pid": os.getpid(), "rss_mb": round(rss_mb(), 1)}
+
+    return gateway
+
+
+def _prefixes_from_env():
+    names = [name for name in os.getenv("GATEWAY_SERVERS", "").split(",") if name]
+    unknown = set(names) - set(SERVERS)
+    if unknown:
+        raise SystemExit(f"GATEWAY_SERVERS: unknown servers {', '.join(sorted(unknown))}")
+    return names or None
+
+
+mcp = create_gateway(_prefixes_from_env())
+
+
 def main():
-    print("Hello from fast-mcp!")
+    parser = argparse.ArgumentParser(description="Serve every demo server from one process.")
+    parser.add_argument("--transport", choices=["stdio", "sse"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    if args.transport == "sse":
+        mcp.run("sse", host=args.host, port=args.port)
+    else:
+        mcp.run("stdio")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,338 @@
+# python ./mcp_bench.py --targets calculator,context_demo --transports memory,stdio,sse --concurrency 1,8,32
+"""
+Load and latency benchmark for the demo servers across MCP transports.
+
+Each target server is driven over an in-memory Client, a stdio subprocess
+and an SSE subprocess. At each concurrency level, workers pick calls from the
+target's weighted mix until CALLS calls have been made. For every target,
+transport and concurrency the output records throughput, latency
+percentiles (overall and per call type), errors and the server's RSS, as
+JSON on stdout or in --out.
+
+Everything runs offline. The Pet Store API is the real Flask app
+(petstore_service.py, in-memory store) served from a thread, and OpenWeather
+is weather_standin.py. Both run in this process and their URLs reach the
+server subprocesses through the environment.
+
+This script also serves targets for the subprocess transports:
+    python mcp_bench.py --serve calculator --transport sse --port 9000
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sys
+import threading
+import time
+
+from process_stats import rss_mb
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TARGETS = {
+    # name: (module, [(weight, kind, name, args(rng))])
+    "calculator": ("calculator_server", [
+        (3, "tool", "add", lambda rng: {"a": rng.randint(0, 99), "b": rng.randint(0, 99)}),
+        (1, "resource", "greeting://{name}", lambda rng: f"greeting://user{rng.randint(0, 99)}"),
+    ]),
+    "tinker": ("tinker_server", [
+        (3, "tool", "add", lambda rng: {"a": rng.randint(0, 99), "b": rng.randint(0, 99)}),
+        (1, "resource", "db://users/{user_id}/email", lambda rng: f"db://users/{rng.choice(['123', '456', '789'])}/email"),
+        (1, "tool", "get_stock_prices", lambda rng: {"tickers": ["AAPL", "GOOG"]}),
+    ]),
+    "context_demo": ("context_demo", [
+        (2, "tool", "summarize_document", lambda rng: {"document_uri": "document://sample"}),
+        (1, "tool", "process_file", lambda rng: {"file_uri": "document://hello"}),
+        (1, "resource", "document://hello", lambda rng: "document://hello"),
+    ]),
+    "petstore": ("petstore_server_basic", [
+        (3, "tool", "listPets", lambda rng: {"limit": 20}),
+        (1, "resource", "resource://getPet/{petId}", lambda rng: f"resource://getPet/{rng.randint(1, 1000)}"),
+    ]),
+    "weather": ("weather_server", [
+        (1, "tool", "get_current_weather", lambda rng: {"city": f"city-{rng.randint(0, 49)}"}),
+    ]),
+}
+
+
+def add_bench_rss(mcp):
+    """Add the bench_rss tool, which reports the server process's RSS, once."""
+    if not getattr(mcp, "_bench_rss", False):
+        mcp._bench_rss = True
+
+        @mcp.tool(name="bench_rss")
+        def bench_rss() -> float:
+            """RSS of the server process in MiB (benchmark only)."""
+            return rss_mb()
+    return mcp
+
+
+def load_server(target):
+    """Import a target's module and add the bench_rss tool to its server."""
+    return add_bench_rss(importlib.import_module(TARGETS[target][0]).mcp)
+
+
+# Offline upstreams
+
+def start_petstore_standin(pets=1000):
+    """Serve petstore_service's Flask app from a thread; returns its base URL."""
+    os.environ.setdefault("PETSTORE_BACKEND", "memory")
+    from werkzeug.serving import make_server
+    import petstore_service
+
+    petstore_service.store.add_many(
+        [{"name": f"pet-{i}", "type": ("cat", "dog", "bird")[i % 3], "age": i % 15} for i in range(pets)]
+    )
+    # one access log line per request would bury the bench's own output
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, petstore_service.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+async def start_standins():
+    from weather_standin import WeatherStandin
+
+    weather = await WeatherStandin(latency=0.01).start()
+    env = {
+        "PETSTORE_BASE_URL": start_petstore_standin(),
+        "OPENWEATHER_BASE_URL": weather.base_url,
+        "OPENWEATHER_API_KEY": "bench",
+        "WEATHER_GEOCODE_CACHE": "",         # don't persist made-up cities
+        "WEATHER_RATE_PER_SEC": "100000",    # measure the server, not the quota
+        "WEATHER_RATE_BURST": "100000",
+        "DOCUMENT_INDEX_PATH": "",
+    }
+    os.environ.update(env)
+    return weather
+
+
+# Clients per transport
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_port(port, proc, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.returncode is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"server did not listen on {port}")
+
+
+class Connection:
+    """An open Client to a target over one transport, plus any subprocess."""
+
+    def __init__(self, target, transport):
+        self.target = target
+        self.transport = transport
+        self.client = None
+        self._proc = None
+
+    async def __aenter__(self):
+        from fastmcp import Client
+        from fastmcp.client.transports import PythonStdioTransport
+
+        serve = [os.path.join(HERE, "mcp_bench.py"), "--serve", self.target]
+        if self.transport == "memory":
+            self.client = Client(load_server(self.target))
+        elif self.transport == "stdio":
+            self.client = Client(PythonStdioTransport(
+                serve[0], args=serve[1:] + ["--transport", "stdio"], env=dict(os.environ), cwd=HERE,
+                python_cmd=sys.executable,
+            ))
+        elif self.transport == "sse":
+            port = free_port()
+            self._proc = await asyncio.create_subprocess_exec(
+                sys.executable, *serve, "--transport", "sse", "--port", str(port),
+                cwd=HERE, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+            )
+            await wait_for_port(port, self._proc)
+            self.client = Client(f"http://127.0.0.1:{port}/sse")
+        else:
+            raise ValueError(f"unknown transport {self.transport!r}")
+        try:
+            await self.client.__aenter__()
+        except BaseException:
+            await self._stop_proc()
+            raise
+        return self.client
+
+    async def __aexit__(self, *exc):
+        try:
+            await self.client.__aexit__(*exc)
+        finally:
+            await self._stop_proc()
+
+    async def _stop_proc(self):
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.terminate()
+            try:
+                await asyncio.wait_for(self._proc.wait(), 10)
+            except asyncio.TimeoutError:
+                self._proc.kill()
+
+
+# Load generation
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies) * 1000 if latencies else None,
+        **{f"p{p}": percentile(latencies, p) * 1000 if latencies else None for p in (50, 95, 99)},
+    }
+
+
+async def call(client, kind, name, args):
+    if kind == "tool":
+        return await client.call_tool(name, args)
+    return await client.read_resource(args)
+
+
+async def run_level(client, mix, concurrency, calls, seed):
+    weights = [weight for weight, *_ in mix]
+    latencies = {name: [] for _, _, name, _ in mix}
+    errors = {}
+    remaining = calls
+
+    async def worker(w):
+        nonlocal remaining
+        rng = random.Random(seed * 1000 + w)
+        while remaining > 0:
+            remaining -= 1
+            _, kind, name, make_args = rng.choices(mix, weights)[0]
+            start = time.perf_counter()
+            try:
+                await call(client, kind, name, make_args(rng))
+            except Exception as e:
+                key = f"{name}: {type(e).__name__}"
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            latencies[name].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": len(everything) / elapsed,
+        "latency_ms": summarize(everything),
+        "per_call_ms": {name: summarize(values) for name, values in latencies.items() if values},
+    }
+
+
+async def bench(target, transport, concurrency_levels, calls, warmup):
+    _, mix = TARGETS[target]
+    result = {"target": target, "transport": transport}
+    started = time.perf_counter()
+    try:
+        async with Connection(target, transport) as client:
+            result["connect_ms"] = (time.perf_counter() - started) * 1000
+            await run_level(client, mix, 1, warmup, seed=0)
+            result["levels"] = []
+            for level in concurrency_levels:
+                result["levels"].append(await run_level(client, mix, level, calls, seed=level))
+                rss = await client.call_tool("bench_rss", {})
+                result["levels"][-1]["server_rss_mb"] = round(float(rss[0].text), 1)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run(args):
+    weather = await start_standins()
+    report = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "calls_per_level": args.calls,
+        "results": [],
+    }
+    try:
+        import fastmcp
+        report["fastmcp"] = fastmcp.__version__
+        for target in args.targets:
+            for transport in args.transports:
+                print(f"{target} over {transport}...", file=sys.stderr)
+                result = await bench(target, transport, args.concurrency, args.calls, args.warmup)
+                report["results"].append(result)
+                for level in result.get("levels", []):
+                    print(
+                        f"  c={level['concurrency']:<3} {level['throughput']:8.1f} calls/s"
+                        f"  p50 {level['latency_ms']['p50'] or 0:7.2f} ms  p99 {level['latency_ms']['p99'] or 0:7.2f} ms"
+                        f"  rss {level['server_rss_mb']} MiB  errors {sum(level['errors'].values())}",
+                        file=sys.stderr,
+                    )
+                if "error" in result:
+                    print(f"  failed: {result['error']}", file=sys.stderr)
+    finally:
+        await weather.close()
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def serve(target, transport, port):
+    mcp = load_server(target)
+    if transport == "sse":
+        mcp.run("sse", host="127.0.0.1", port=port, log_level="warning")
+    else:
+        mcp.run("stdio")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    csv = lambda value: [item for item in value.split(",") if item]  # noqa: E731
+    parser.add_argument("--targets", type=csv, default=["calculator", "context_demo", "petstore", "weather", "tinker"])
+    parser.add_argument("--transports", type=csv, default=["memory", "stdio", "sse"])
+    parser.add_argument("--concurrency", type=lambda value: [int(c) for c in csv(value)], default=[1, 8, 32])
+    parser.add_argument("--calls", type=int, default=500, help="calls per concurrency level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--serve", choices=sorted(TARGETS), help=argparse.SUPPRESS)
+    parser.add_argument("--transport", default="stdio", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.transport, args.port)
+        return
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
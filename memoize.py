@@ -0,0 +1,116 @@
+"""
+Opt-in result caching for pure tools and resources.
+
+Mark a function with ``@memoize(...)`` next to its registration, then call
+``enable_memoization(mcp)`` once the server is built:
+
+    @mcp.tool()
+    @memoize(ttl=300)
+    def add(a: int, b: int) -> int: ...
+
+    @mcp.resource("greeting://{name}")
+    @memoize(maxsize=1000)
+    def get_greeting(name: str) -> str: ...
+
+    enable_memoization(mcp)
+
+Tool calls are keyed on their canonicalized JSON arguments and resource
+reads on their URI. What is cached is the finished MCP result (the content
+list for tools, the str/bytes for resources), so a hit skips argument
+validation, the function and result serialization altogether. Errors are
+never cached, and concurrent misses for the same key share one call.
+Only use it on functions whose result depends on nothing but their arguments.
+"""
+import json
+import math
+
+from fastmcp.resources.template import match_uri_template
+
+from ttl_cache import AsyncTTLCache
+
+
+def memoize(fn=None, *, ttl=None, maxsize=256):
+    """Mark a tool or resource function as cacheable.
+
+    ttl is in seconds (None: until evicted); maxsize bounds entries (LRU).
+    """
+    def mark(fn):
+        fn.__memoize__ = AsyncTTLCache(math.inf if ttl is None else ttl, maxsize=maxsize)
+        return fn
+
+    return mark if fn is None else mark(fn)
+
+
+def _cache_of(fn):
+    return getattr(fn, "__memoize__", None)
+
+
+def _canonical(arguments):
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def enable_memoization(mcp, stats_uri="cache://memo/stats"):
+    """Serve @memoize-marked tools and resources of mcp from their caches.
+
+    Also registers a resource at ``stats_uri`` (if set) with hit rates per
+    tool and resource.
+    """
+    tools = mcp._tool_manager
+    resources = mcp._resource_manager
+    if getattr(tools, "_memoized", False):
+        return
+    tools._memoized = True
+
+    call_tool = tools.call_tool
+    read_resource = resources.read_resource
+
+    async def memoized_call_tool(key, arguments):
+        tool = tools.get_tool(key)
+        cache = _cache_of(tool.fn) if tool else None
+        if cache is None:
+            return await call_tool(key, arguments)
+        return await cache.get_or_fetch(_canonical(arguments), lambda: call_tool(key, arguments))
+
+    def resource_cache(uri):
+        resource = resources._resources.get(uri)
+        if resource is not None:
+            return _cache_of(getattr(resource, "fn", None))
+        for storage_key, template in resources._templates.items():
+            if match_uri_template(uri, storage_key) is not None:
+                return _cache_of(template.fn)
+        return None
+
+    async def memoized_read_resource(uri):
+        uri = str(uri)
+        cache = resource_cache(uri)
+        if cache is None:
+            return await read_resource(uri)
+        return await cache.get_or_fetch(uri, lambda: read_resource(uri))
+
+    tools.call_tool = memoized_call_tool
+    resources.read_resource = memoized_read_resource
+
+    if stats_uri:
+        @mcp.resource(stats_uri)
+        def get_memo_stats() -> dict:
+            """Hit rates of the memoized tools and resources."""
+            return memo_stats(mcp)
+
+
+def memo_stats(mcp):
+    """Cache stats per memoized tool name and resource URI (or template)."""
+    def stats(cache):
+        result = cache.stats()
+        if result["ttl"] == math.inf:
+            result["ttl"] = None
+        return result
+
+    tools = mcp._tool_manager.get_tools()
+    resources = mcp._resource_manager
+    return {
+        "tools": {name: stats(_cache_of(tool.fn)) for name, tool in tools.items() if _cache_of(tool.fn)},
+        "resources": {
+            **{uri: stats(_cache_of(r.fn)) for uri, r in resources._resources.items() if _cache_of(getattr(r, "fn", None))},
+            **{key: stats(_cache_of(t.fn)) for key, t in resources._templates.items() if _cache_of(t.fn)},
+        },
+    }
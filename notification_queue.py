@@ -0,0 +1,186 @@
+"""
+Background delivery for notifications.
+
+send_notification only enqueues: NotificationQueue.submit() puts the message
+on a bounded asyncio queue and returns at once. Worker tasks take whatever
+has queued up (up to ``batch_size`` messages, waiting at most
+``batch_window`` seconds to fill a batch), group it by user and hand each
+group to the sender in one call. Failed sends are retried with jittered
+exponential backoff; after ``max_retries`` the batch is counted as failed.
+
+When the queue is full, submit() refuses the message straight away rather
+than blocking the tool call; before start() (or after stop()) it raises, as
+nothing would deliver what it accepted.
+
+A sender is any object with ``async send(user_id, messages)``.
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PrintSender:
+    """Stand-in sender that prints, like send_notification used to.
+
+    To stderr: on the stdio transport stdout carries the protocol.
+    """
+
+    async def send(self, user_id, messages):
+        for message in messages:
+            print(f"Notifying user {user_id}: {message}", file=sys.stderr)
+
+
+class NotificationQueue:
+    def __init__(self, sender, workers=2, max_queue=10_000, batch_size=100, batch_window=0.05,
+                 max_retries=3, backoff=0.5):
+        self.sender = sender
+        self.workers = workers
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue = None
+        self._ready = None       # set whenever a message is queued
+        self._tasks = []
+        self._users = 0
+        # metrics
+        self.enqueued = 0
+        self.rejected = 0
+        self.delivered = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.last_error = None
+        self._dequeued = 0
+        self._wait_total = 0.0
+        self._recent = deque()   # (time, messages delivered) over the last minute
+
+    # Lifecycle
+
+    async def start(self):
+        """Start the workers; nested start/stop pairs share them."""
+        self._users += 1
+        if not self._tasks:
+            if self._queue is None:
+                self._queue = asyncio.Queue(self.max_queue)
+                self._ready = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout=5.0):
+        """Stop the workers, first giving queued messages drain_timeout to go out."""
+        self._users -= 1
+        if self._users > 0 or not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d notifications undelivered", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._users = 0
+
+    # Producer side
+
+    def submit(self, user_id, message):
+        """Queue a message without waiting; returns False if the queue is full.
+
+        Raises RuntimeError if the workers aren't running.
+        """
+        if not self._tasks:
+            raise RuntimeError("notification workers are not running")
+        try:
+            self._queue.put_nowait((user_id, message, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self._ready.set()
+        self.enqueued += 1
+        return True
+
+    # Workers
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            # Wait for submit() to signal rather than wait_for(queue.get()):
+            # a get that completes as the timeout fires loses its item
+            self._ready.clear()
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await self._ready.wait()
+            except TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                now = time.monotonic()
+                by_user = {}
+                for user_id, message, queued_at in batch:
+                    by_user.setdefault(user_id, []).append(message)
+                    self._wait_total += now - queued_at
+                self._dequeued += len(batch)
+                for user_id, messages in by_user.items():
+                    await self._deliver(user_id, messages)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, user_id, messages):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.sender.send(user_id, messages)
+            except Exception as e:
+                self.last_error = str(e)
+                if attempt == self.max_retries:
+                    self.failed += len(messages)
+                    logger.warning("Giving up on %d notifications for user %s: %s", len(messages), user_id, e)
+                    return
+                self.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+            else:
+                self.batches += 1
+                self.delivered += len(messages)
+                self._recent.append((time.monotonic(), len(messages)))
+                self._trim_recent()
+                return
+
+    def _trim_recent(self):
+        # Trimmed on every delivery as well as in stats(), so a queue nobody
+        # polls doesn't keep a record of every batch it ever sent
+        cutoff = time.monotonic() - 60
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+    def stats(self):
+        self._trim_recent()
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "workers": len(self._tasks),
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "last_error": self.last_error,
+            "delivered_per_sec_1m": sum(n for _, n in self._recent) / 60,
+            "avg_queue_wait_ms": self._wait_total / self._dequeued * 1000 if self._dequeued else 0.0,
+        }
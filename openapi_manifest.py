@@ -0,0 +1,223 @@
+"""
+OpenAPI-backed FastMCP server that starts from a cached component manifest.
+
+FastMCP.from_openapi imports the OpenAPI machinery (a few hundred ms) and
+walks the whole spec at every launch, which dominates the startup of stdio
+servers launched on demand. LazyOpenAPIServer instead:
+
+- keys the spec, route maps and fastmcp version with a hash
+- on a manifest hit, answers list_tools / list_resources /
+  list_resource_templates from the JSON manifest in OPENAPI_MANIFEST_DIR
+  (default .mcp_manifests), without importing any of the OpenAPI code
+- builds the real from_openapi server, in a worker thread, only when a
+  generated tool or resource is first used; on a miss it builds it at once
+  and writes the manifest for next time
+
+Components registered directly on the server (e.g. a stats resource) work as
+on any FastMCP server. Route maps are given as plain dicts with RouteMap's
+fields, e.g. {"methods": ["GET"], "pattern": r"^/pets$", "mcp_type": "TOOL"},
+so they can be hashed and so building them doesn't need the OpenAPI import.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+import fastmcp
+import mcp.types
+from fastmcp import FastMCP
+from fastmcp.resources import FunctionResource, ResourceTemplate
+from fastmcp.tools import Tool
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = os.getenv("OPENAPI_MANIFEST_DIR", ".mcp_manifests")
+MANIFEST_VERSION = 1
+
+
+def spec_key(spec, route_maps=(), name=None):
+    """Hash of everything the generated components depend on."""
+    payload = json.dumps(
+        {
+            "spec": spec,
+            "route_maps": list(route_maps),
+            "name": name,
+            "fastmcp": fastmcp.__version__,
+            "manifest": MANIFEST_VERSION,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _not_loaded(**kwargs):
+    raise RuntimeError("placeholder for a component of a server that isn't built yet")
+
+
+class LazyOpenAPIServer(FastMCP):
+    def __init__(self, openapi_spec, client, name=None, route_maps=(), manifest_dir=MANIFEST_DIR, **settings):
+        super().__init__(name=name or "OpenAPI FastMCP", **settings)
+        self._spec = openapi_spec
+        self._client = client
+        self._route_maps = [dict(route_map) for route_map in route_maps]
+        self._key = spec_key(openapi_spec, self._route_maps, name)
+        self._manifest_path = os.path.join(manifest_dir, f"{self._key}.json") if manifest_dir else None
+        self._openapi_server = None
+        self._build_lock = asyncio.Lock()
+        self._placeholders = None
+        self.startup = {"manifest": "miss", "build_ms": None}
+
+        manifest = self._load_manifest()
+        if manifest is None:
+            # No manifest to list from: build now (and save one for next time)
+            self._build()
+        else:
+            self.startup["manifest"] = "hit"
+            self._placeholders = self._placeholders_from(manifest)
+
+    # Manifest
+
+    def _load_manifest(self):
+        if not self._manifest_path:
+            return None
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("key") == self._key else None
+
+    async def _manifest_of(self, server):
+        tools = await server.get_tools()
+        resources = await server.get_resources()
+        templates = await server.get_resource_templates()
+        dump = lambda model: model.model_dump(mode="json", by_alias=True, exclude_none=True)  # noqa: E731
+        return {
+            "key": self._key,
+            "tools": [dump(tool.to_mcp_tool(name=key)) for key, tool in tools.items()],
+            "resources": [dump(resource.to_mcp_resource(uri=key)) for key, resource in resources.items()],
+            "templates": [dump(template.to_mcp_template(uriTemplate=key)) for key, template in templates.items()],
+        }
+
+    def _save_manifest(self, manifest):
+        os.makedirs(os.path.dirname(self._manifest_path) or ".", exist_ok=True)
+        tmp = f"{self._manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp, self._manifest_path)
+
+    @staticmethod
+    def _placeholders_from(manifest):
+        """Listing-only stand-ins for the generated components."""
+        tools = {}
+        for item in manifest["tools"]:
+            tool = mcp.types.Tool.model_validate(item)
+            tools[tool.name] = Tool(
+                fn=_not_loaded, name=tool.name, description=tool.description or "",
+                parameters=tool.inputSchema, annotations=tool.annotations,
+            )
+        resources = {}
+        for item in manifest["resources"]:
+            resource = mcp.types.Resource.model_validate(item)
+            resources[str(resource.uri)] = FunctionResource(
+                fn=_not_loaded, uri=resource.uri, name=resource.name,
+                description=resource.description, mime_type=resource.mimeType or "text/plain",
+            )
+        templates = {}
+        for item in manifest["templates"]:
+            template = mcp.types.ResourceTemplate.model_validate(item)
+            templates[template.uriTemplate] = ResourceTemplate(
+                fn=_not_loaded, uri_template=template.uriTemplate, name=template.name,
+                description=template.description, mime_type=template.mimeType or "text/plain", parameters={},
+            )
+        return tools, resources, templates
+
+    def generated_names(self):
+        """Names of the generated tools, resources and templates (None until known)."""
+        if self._placeholders is None:
+            return None
+        tools, resources, templates = self._placeholders
+        return {"tools": list(tools), "resources": list(resources), "templates": list(templates)}
+
+    # The real server
+
+    def _build(self):
+        started = time.perf_counter()
+        from fastmcp.server.openapi import MCPType, RouteMap
+
+        route_maps = [
+            RouteMap(**{**route_map, "mcp_type": MCPType[route_map.get("mcp_type", "TOOL")]})
+            for route_map in self._route_maps
+        ]
+        server = FastMCP.from_openapi(
+            openapi_spec=self._spec, client=self._client, name=self.name, route_maps=route_maps,
+        )
+        if self._placeholders is None:
+            manifest = asyncio.run(self._manifest_of(server)) if not _loop_running() else None
+            if manifest is not None:
+                self._placeholders = self._placeholders_from(manifest)
+                if self._manifest_path:
+                    self._save_manifest(manifest)
+        self._openapi_server = server
+        self.startup["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Built OpenAPI server %s in %s ms", self.name, self.startup["build_ms"])
+        return server
+
+    async def openapi_server(self):
+        """The from_openapi server, built on first use."""
+        if self._openapi_server is None:
+            async with self._build_lock:
+                if self._openapi_server is None:
+                    await asyncio.to_thread(self._build)
+        if self._placeholders is None:
+            manifest = await self._manifest_of(self._openapi_server)
+            self._placeholders = self._placeholders_from(manifest)
+            if self._manifest_path:
+                self._save_manifest(manifest)
+        return self._openapi_server
+
+    async def _generated(self):
+        if self._placeholders is None:
+            await self.openapi_server()
+        return self._placeholders
+
+    # FastMCP overrides: generated components come from the manifest, own
+    # (and mounted) ones from FastMCP as usual
+
+    async def get_tools(self):
+        tools, _, _ = await self._generated()
+        return {**tools, **await super().get_tools()}
+
+    async def get_resources(self):
+        _, resources, _ = await self._generated()
+        return {**resources, **await super().get_resources()}
+
+    async def get_resource_templates(self):
+        _, _, templates = await self._generated()
+        return {**templates, **await super().get_resource_templates()}
+
+    async def _mcp_call_tool(self, key, arguments):
+        tools, _, _ = await self._generated()
+        if key in tools and not self._tool_manager.has_tool(key):
+            server = await self.openapi_server()
+            return await server._mcp_call_tool(key, arguments)
+        return await super()._mcp_call_tool(key, arguments)
+
+    async def _mcp_read_resource(self, uri):
+        if not self._resource_manager.has_resource(uri) and not any(
+            mounted.match_resource(str(uri)) for mounted in self._mounted_servers.values()
+        ):
+            server = await self.openapi_server()
+            return await server._mcp_read_resource(uri)
+        return await super()._mcp_read_resource(uri)
+
+
+def _loop_running():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
@@ -0,0 +1,135 @@
+# python ./openapi_startup_bench.py
+"""
+Cold start of an OpenAPI-generated MCP server over stdio.
+
+For the Pet Store spec and a synthetic spec with SYNTHETIC_PATHS paths (two
+operations each), spawn the server and time:
+- ready: process start to the answer of the first tools/list
+- first call: the first tools/call after that, which is where
+  LazyOpenAPIServer builds the real server
+
+This is done three ways: eager from_openapi, lazy with no manifest (first
+run) and lazy with a cached manifest. The run fails (exit 1) if a cached
+start is over COLD_START_BUDGET_MS. The upstream is an httpx MockTransport
+answering [] at once, so the first call time is the lazy build plus one
+round trip.
+"""
+import asyncio
+import copy
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SYNTHETIC_PATHS = 300
+RUNS = 5
+COLD_START_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", 1500))
+
+
+def synthetic_spec(paths=SYNTHETIC_PATHS):
+    from petstore_spec import PETSTORE_SPEC
+
+    spec = copy.deepcopy(PETSTORE_SPEC)
+    for i in range(paths):
+        spec["paths"][f"/things{i}/{{thingId}}"] = {
+            "get": {
+                "operationId": f"getThing{i}",
+                "summary": f"Get thing {i}",
+                "parameters": [
+                    {"name": "thingId", "in": "path", "required": True, "schema": {"type": "integer"}},
+                    {"name": "fields", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "A thing", "content": {"application/json": {
+                    "schema": {"type": "object", "properties": {"id": {"type": "integer"}, "name": {"type": "string"}}},
+                }}}},
+            },
+            "put": {
+                "operationId": f"putThing{i}",
+                "summary": f"Replace thing {i}",
+                "parameters": [{"name": "thingId", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "requestBody": {"content": {"application/json": {"schema": {
+                    "type": "object",
+                    "properties": {"name": {"type": "string"}, "size": {"type": "integer"}},
+                    "required": ["name"],
+                }}}},
+                "responses": {"200": {"description": "Replaced"}},
+            },
+        }
+    return spec
+
+
+def serve(mode, spec_name):
+    """Run one server over stdio (called in the child process)."""
+    import httpx
+
+    spec = synthetic_spec() if spec_name == "synthetic" else __import__("petstore_spec").PETSTORE_SPEC
+    client = httpx.AsyncClient(
+        base_url="http://petstore.invalid", transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])),
+    )
+    route_maps = [{"methods": ["GET"], "pattern": r"^/pets$", "mcp_type": "TOOL"}]
+    if mode == "eager":
+        from fastmcp import FastMCP
+        from fastmcp.server.openapi import MCPType, RouteMap
+
+        mcp = FastMCP.from_openapi(
+            openapi_spec=spec, client=client, name=spec_name,
+            route_maps=[RouteMap(methods=["GET"], pattern=r"^/pets$", mcp_type=MCPType.TOOL)],
+        )
+    else:
+        from openapi_manifest import LazyOpenAPIServer
+
+        mcp = LazyOpenAPIServer(openapi_spec=spec, client=client, name=spec_name, route_maps=route_maps)
+    mcp.run("stdio")
+
+
+async def measure(mode, spec_name, manifest_dir):
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    env = {**os.environ, "OPENAPI_MANIFEST_DIR": manifest_dir, "FASTMCP_LOG_LEVEL": "ERROR"}
+    transport = PythonStdioTransport(
+        os.path.join(HERE, "openapi_startup_bench.py"), args=["--serve", mode, spec_name],
+        env=env, cwd=HERE, python_cmd=sys.executable,
+    )
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        tools = await client.list_tools()
+        ready = time.perf_counter() - start
+        start = time.perf_counter()
+        await client.call_tool("listPets", {"limit": 1})
+        first_call = time.perf_counter() - start
+    return ready * 1000, first_call * 1000, len(tools)
+
+
+async def main():
+    over_budget = False
+    print(f"{'spec':<10} {'mode':<14} {'tools':>5} {'ready ms':>9} {'first call ms':>14}")
+    for spec_name in ("petstore", "synthetic"):
+        manifest_dir = tempfile.mkdtemp(prefix="mcp-manifests-")
+        try:
+            for mode, label in (("eager", "eager"), ("lazy", "lazy, no cache"), ("lazy", "lazy, cached")):
+                runs = []
+                for _ in range(RUNS):
+                    if label == "lazy, no cache":
+                        shutil.rmtree(manifest_dir, ignore_errors=True)
+                    runs.append(await measure(mode, spec_name, manifest_dir))
+                ready = statistics.median(run[0] for run in runs)
+                first_call = statistics.median(run[1] for run in runs)
+                flag = ""
+                if label == "lazy, cached" and ready > COLD_START_BUDGET_MS:
+                    flag, over_budget = "  OVER BUDGET", True
+                print(f"{spec_name:<10} {label:<14} {runs[0][2]:>5} {ready:>9.0f} {first_call:>14.0f}{flag}")
+        finally:
+            shutil.rmtree(manifest_dir, ignore_errors=True)
+    print(f"cold-start budget (cached manifest, ready): {COLD_START_BUDGET_MS:.0f} ms")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:
+        serve(sys.argv[2], sys.argv[3])
+    else:
+        sys.exit(asyncio.run(main()))
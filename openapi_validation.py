@@ -0,0 +1,252 @@
+"""
+Request validators compiled from an OpenAPI spec.
+
+Each schema is turned once into a chain of small Python closures, so checking a
+request is a few isinstance tests rather than a walk over the schema dict:
+
+    validators = compile_operations(PETSTORE_SPEC)
+    error = validators["createPet"].validate({}, {}, {"name": "Rex"})
+    # -> "type is required"
+
+A compiled validator returns (value, error message or None), like the
+hand-written checks it replaces. With coerce=True (the default) integer,
+number and boolean fields also accept their string forms ("3" -> 3), as
+query and path parameters always arrive as strings; the returned value holds
+the converted fields.
+
+Only the keywords the demo specs use are understood: type, nullable,
+properties, required, items, min/maxItems, minimum/maximum, min/maxLength and
+enum. Anything else is ignored rather than rejected.
+"""
+import math
+
+_TRUE = {"true", "1"}
+_FALSE = {"false", "0"}
+
+
+def _compile(schema, coerce, items):
+    """Return check(value) -> (value, error); errors are relative to the value,
+    starting with " " (about the value itself), "." (a property) or "[" (an item)."""
+    kind = schema.get("type")
+    nullable = schema.get("nullable", False)
+    checks = []
+
+    if kind == "integer":
+        def check_type(value):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value, None
+            if coerce:
+                if isinstance(value, float) and value.is_integer():
+                    return int(value), None
+                if isinstance(value, str):
+                    try:
+                        return int(value), None
+                    except ValueError:
+                        pass
+            return value, " must be an integer"
+    elif kind == "number":
+        def check_type(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value, None
+            if coerce and isinstance(value, str):
+                try:
+                    number = float(value)
+                except ValueError:
+                    pass
+                else:
+                    if math.isfinite(number):
+                        return number, None
+            return value, " must be a number"
+    elif kind == "boolean":
+        def check_type(value):
+            if isinstance(value, bool):
+                return value, None
+            if coerce and isinstance(value, str) and value.lower() in _TRUE | _FALSE:
+                return value.lower() in _TRUE, None
+            return value, " must be a boolean"
+    elif kind == "string":
+        def check_type(value):
+            if isinstance(value, str):
+                return value, None
+            return value, " must be a string"
+    elif kind == "array":
+        def check_type(value):
+            if isinstance(value, list):
+                return value, None
+            return value, " must be an array"
+    elif kind == "object" or "properties" in schema or "required" in schema:
+        def check_type(value):
+            if isinstance(value, dict):
+                return value, None
+            return value, " must be an object"
+    else:
+        check_type = None
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value):
+            if value in allowed:
+                return value, None
+            return value, f" must be one of {', '.join(map(str, allowed))}"
+        checks.append(check_enum)
+
+    if "minimum" in schema or "maximum" in schema:
+        low, high = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value):
+            if low is not None and value < low:
+                return value, f" must be at least {low}"
+            if high is not None and value > high:
+                return value, f" must be at most {high}"
+            return value, None
+        checks.append(check_range)
+
+    if "minLength" in schema or "maxLength" in schema or "minItems" in schema or "maxItems" in schema:
+        low = schema.get("minLength", schema.get("minItems"))
+        high = schema.get("maxLength", schema.get("maxItems"))
+        unit = "items" if kind == "array" else "characters"
+
+        def check_length(value):
+            if low is not None and len(value) < low:
+                return value, f" must have at least {low} {unit}"
+            if high is not None and len(value) > high:
+                return value, f" must have at most {high} {unit}"
+            return value, None
+        checks.append(check_length)
+
+    if kind == "array" and items and "items" in schema:
+        check_item = _compile(schema["items"], coerce, items)
+
+        def check_items(value):
+            for index, item in enumerate(value):
+                converted, error = check_item(item)
+                if error:
+                    return value, f"[{index}]{error}"
+                if converted is not item:
+                    value[index] = converted
+            return value, None
+        checks.append(check_items)
+
+    if "properties" in schema or "required" in schema:
+        required = tuple(schema.get("required", ()))
+        properties = tuple(
+            (name, _compile(subschema, coerce, items))
+            for name, subschema in schema.get("properties", {}).items()
+        )
+        check_object, check_type = check_type, None   # folded in below
+
+        def check_properties(value):
+            if check_object is not None and not isinstance(value, dict):
+                return value, " must be an object"
+            for name in required:
+                if name not in value:
+                    return value, f".{name} is required"
+            for name, check_property in properties:
+                if name in value:
+                    item = value[name]
+                    converted, error = check_property(item)
+                    if error:
+                        return value, f".{name}{error}"
+                    if converted is not item:
+                        value[name] = converted
+            return value, None
+        checks.append(check_properties)
+
+    steps = ([check_type] if check_type is not None else []) + checks
+
+    def check(value):
+        if value is None and nullable:
+            return value, None
+        for step in steps:
+            value, error = step(value)
+            if error:
+                return value, error
+        return value, None
+
+    # Skip the wrapper for the common single-step schemas
+    if len(steps) == 1 and not nullable:
+        return steps[0]
+    return check
+
+
+def _message(name, error):
+    # "age must be..." rather than "pet.age must be..."; the name is kept for
+    # errors about the value itself or its items
+    return error[1:] if error.startswith(".") else f"{name}{error}"
+
+
+def compile_schema(schema, name="value", coerce=True, items=True):
+    """Compile a JSON schema into validate(value) -> (value, error).
+
+    ``name`` labels errors about the value as a whole ("pet must be an
+    object"). With items=False array items are not checked, only the array
+    itself.
+    """
+    check = _compile(schema or {}, coerce, items)
+
+    def validate(value):
+        value, error = check(value)
+        return (value, None) if error is None else (value, _message(name, error))
+
+    validate.schema = schema
+    return validate
+
+
+class OperationValidator:
+    """The compiled parameter and JSON body checks of one operation."""
+
+    def __init__(self, operation, path_parameters=(), coerce=True, items=True):
+        self.operation_id = operation.get("operationId")
+        self.parameters = {"path": {}, "query": {}}
+        self.required = {"path": (), "query": ()}
+        merged = {(p["name"], p.get("in")): p for p in [*path_parameters, *operation.get("parameters", [])]}
+        for (name, location), parameter in merged.items():
+            if location not in self.parameters:
+                continue   # headers and cookies aren't checked
+            self.parameters[location][name] = compile_schema(parameter.get("schema"), name, coerce, items)
+            if parameter.get("required") or location == "path":
+                self.required[location] += (name,)
+
+        body = operation.get("requestBody") or {}
+        schema = body.get("content", {}).get("application/json", {}).get("schema")
+        self.body_required = bool(body.get("required"))
+        self.body_schema = schema
+        self.body = compile_schema(schema, "body", coerce, items) if schema is not None else None
+
+    def validate(self, path, query, body=None):
+        """Check a request's parameters (dicts of name -> value) and parsed
+        JSON body; returns an error message, or None if it is valid."""
+        for values, location in ((path, "path"), (query, "query")):
+            if not values:
+                if self.required[location]:
+                    return f"{self.required[location][0]} is required"
+                continue
+            for name in self.required[location]:
+                if name not in values:
+                    return f"{name} is required"
+            checks = self.parameters[location]
+            for name, value in values.items():
+                check = checks.get(name)
+                if check is not None:
+                    _, error = check(value)
+                    if error:
+                        return error
+        if body is None:
+            return "request body is required" if self.body_required else None
+        if self.body is not None:
+            _, error = self.body(body)
+            return error
+        return None
+
+
+def compile_operations(spec, coerce=True, items=True):
+    """Compile every operation in ``spec``: {operationId: OperationValidator}."""
+    validators = {}
+    for item in spec.get("paths", {}).values():
+        for method, operation in item.items():
+            if isinstance(operation, dict) and "operationId" in operation:
+                validators[operation["operationId"]] = OperationValidator(
+                    operation, item.get("parameters", ()), coerce, items
+                )
+    return validators
@@ -1,53 +1,46 @@
-import asyncio
-import httpx
-from fastmcp import FastMCP
+import sys
+
+from openapi_manifest import LazyOpenAPIServer
 
 # Import the OpenAPI spec from the separate file
-from petstore_spec import PETSTORE_SPEC
+from petstore_spec import PETSTORE_OPERATION_TIMEOUTS, PETSTORE_SPEC
+from upstream_client import UpstreamConfig, create_upstream_client, upstream_stats
+
+# Create HTTP client pointing to our local server (override with
+# PETSTORE_BASE_URL, PETSTORE_MAX_CONNECTIONS, ...). Repeated GETs are
+# revalidated with If-None-Match and reuse the cached body on a 304.
+config = UpstreamConfig.from_env("PETSTORE", operation_timeouts=PETSTORE_OPERATION_TIMEOUTS)
+client = create_upstream_client(config, spec=PETSTORE_SPEC)
+
+# Create the MCP server from the spec. Tools and resources are listed from a
+# manifest cached under .mcp_manifests (keyed by a hash of the spec), and the
+# from_openapi conversion only runs when one of them is first called.
+mcp = LazyOpenAPIServer(
+    openapi_spec=PETSTORE_SPEC,
+    client=client,
+    name="PetStore",
+    # GET routes default to resources, which can't take the limit/cursor
+    # query parameters; expose the paginated listing as the listPets tool
+    route_maps=[{"methods": ["GET"], "pattern": r"^/pets$", "mcp_type": "TOOL"}],
+)
+
+@mcp.resource("upstream://petstore/stats")
+def get_upstream_stats() -> dict:
+    """Connection pool, retry and circuit breaker statistics for the Pet Store API."""
+    return upstream_stats(client)
 
 def main():
-    # Create HTTP client pointing to our local server
-    client = httpx.AsyncClient(base_url="http://localhost:5000")
-    
-    # Create the MCP server with our imported spec - notice the missing "await"
-    # FastMCP.from_openapi is a synchronous method in this version
-    mcp = FastMCP.from_openapi(
-        openapi_spec=PETSTORE_SPEC,
-        client=client,
-        name="PetStore"
-    )
-    
-    # Define an async function to get the components
-    async def get_components():
-        # Use get_ methods instead of list_ methods
-        tools = await mcp.get_tools()
-        resources = await mcp.get_resources()
-        templates = await mcp.get_resource_templates()
-        
-        print(f"Tools: {len(tools)}")
-        for tool in tools:
-            print(f"  - {tool}")
-            
-        print(f"Resources: {len(resources)}")
-        for resource in resources:
-            print(f"  - {resource}")
-            
-        print(f"Templates: {len(templates)}")
-        for template in templates:
-            print(f"  - {template}")
-    
-    # Run the async function to get components
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(get_components())
-    
+    # stdout carries the stdio transport, so status goes to stderr
+    names = mcp.generated_names()
+    print(f"Pet Store FastMCP server (manifest {mcp.startup['manifest']})", file=sys.stderr)
+    print(f"Tools: {', '.join(names['tools'])}", file=sys.stderr)
+    print(f"Resources: {', '.join([*names['resources'], 'upstream://petstore/stats'])}", file=sys.stderr)
+    print(f"Templates: {', '.join(names['templates'])}", file=sys.stderr)
+    print("Make sure petstore_service.py is running first!", file=sys.stderr)
+
     # Start the MCP server (this is synchronous)
-    print("\nStarting FastMCP server...")
-    # mcp.run("sse")
     mcp.run()
-    
+
 
 if __name__ == "__main__":
-    print("Pet Store FastMCP Client")
-    print("Make sure the petstore_server.py is running first!")
-    main()  # Call regular main, not asyncio.run(main())
\ No newline at end of file
+    main()
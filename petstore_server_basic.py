@@ -1,14 +1,28 @@
 # % fastmcp dev ./petstore_server_basic.py
-import httpx
 from fastmcp import FastMCP
-from petstore_spec import PETSTORE_SPEC as spec
+from fastmcp.server.openapi import MCPType, RouteMap
+from petstore_spec import PETSTORE_OPERATION_TIMEOUTS, PETSTORE_SPEC as spec
+from upstream_client import UpstreamConfig, create_upstream_client, upstream_stats
 
 # Create a client for your API
-api_client = httpx.AsyncClient(base_url="http://localhost:5000")
+api_client = create_upstream_client(
+    UpstreamConfig.from_env("PETSTORE", operation_timeouts=PETSTORE_OPERATION_TIMEOUTS),
+    spec=spec,
+)
 
 
 # Create an MCP server from your OpenAPI spec
-mcp = FastMCP.from_openapi(openapi_spec=spec, client=api_client)
+# (listPets is a tool so agents can pass limit/cursor to page through pets)
+mcp = FastMCP.from_openapi(
+    openapi_spec=spec,
+    client=api_client,
+    route_maps=[RouteMap(methods=["GET"], pattern=r"^/pets$", mcp_type=MCPType.TOOL)],
+)
+
+@mcp.resource("upstream://petstore/stats")
+def get_upstream_stats() -> dict:
+    """Connection pool, retry and circuit breaker statistics for the Pet Store API."""
+    return upstream_stats(api_client)
 
 if __name__ == "__main__":
     mcp.run("stdio")
\ No newline at end of file
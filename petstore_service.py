@@ -1,53 +1,257 @@
-from flask import Flask, jsonify, request, make_response
+import base64
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Flask, Response, jsonify, request, make_response
+
+from openapi_validation import OperationValidator, compile_schema
+from petstore_spec import PETSTORE_SPEC
+from petstore_store import DuplicatePetError, PoolExhaustedError, create_store
+
+# Use orjson for response bodies when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
-# In-memory database for pets
-pets = [
+# Database for pets. In-memory by default; set PETSTORE_BACKEND=sqlite to keep
+# pets in PETSTORE_DB and serve them from several workers, e.g.
+#   PETSTORE_BACKEND=sqlite gunicorn -w 4 petstore_service:app
+store = create_store(pets=[
     {"id": "1", "name": "Fluffy", "type": "cat", "age": 3},
     {"id": "2", "name": "Rex", "type": "dog", "age": 5},
     {"id": "3", "name": "Bubbles", "type": "fish", "age": 1}
-]
+])
+
+def _query_args(operation):
+    """Read the query parameters an OperationValidator declares, converted by
+    its compiled checks; raises ValueError with the first problem"""
+    args = {}
+    for name, check in operation.parameters["query"].items():
+        value = request.args.get(name)
+        if value is None or value == "":
+            continue
+        args[name], error = check(value)
+        if error:
+            raise ValueError(error)
+    return args
+
+def _dumps(obj):
+    """Encode obj as compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+class ResponseCache:
+    """LRU cache of encoded JSON bodies and their ETags.
+
+    Entries are only valid for the store version they were built from; the
+    first lookup after a write drops the whole cache.
+    """
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, body):
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = (body, etag)
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = entry
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+response_cache = ResponseCache()
+
+def _cached_json(key, build):
+    """Serve build()'s result from the response cache, honouring If-None-Match.
+
+    build() returns the object to encode, or None when there is nothing to
+    serve (in which case this returns None too).
+    """
+    version = store.version
+    entry = response_cache.get(key, version)
+    if entry is None:
+        obj = build()
+        if obj is None:
+            return None
+        entry = response_cache.put(key, version, _dumps(obj))
+
+    body, etag = entry
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+# Page sizes for GET /pets
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON = "application/x-ndjson"
+
+# GET /pets parameters are checked against the listPets operation in the spec,
+# like the MCP servers check them before sending, so limit above the spec's
+# maximum is a 400 here too rather than quietly clamped
+_list_pets_params = OperationValidator(PETSTORE_SPEC["paths"]["/pets"]["get"])
+
+def _encode_cursor(after):
+    """Turn a store position into an opaque cursor string"""
+    return base64.urlsafe_b64encode(str(after).encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        after = int(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("cursor is invalid")
+    if after < 0:
+        raise ValueError("cursor is invalid")
+    return after
+
+def _stream_ndjson(filters, after, limit):
+    """Yield pets one JSON document per line, a page at a time"""
+    while limit is None or limit > 0:
+        size = MAX_PAGE_SIZE if limit is None else min(limit, MAX_PAGE_SIZE)
+        pets, after = store.page(**filters, after=after, limit=size)
+        if pets:
+            yield "".join(json.dumps(pet) + "\n" for pet in pets)
+        if after is None:
+            return
+        if limit is not None:
+            limit -= len(pets)
 
 @app.route('/pets', methods=['GET'])
 def list_pets():
-    """List all pets"""
-    return jsonify(pets)
+    """List pets a page at a time, optionally filtered by type and age range.
+
+    Responds with {"pets": [...], "next_cursor": ...}; pass next_cursor back as
+    ?cursor= to fetch the following page. Clients that accept
+    application/x-ndjson instead get every match streamed one pet per line.
+    """
+    try:
+        args = _query_args(_list_pets_params)
+        filters = {
+            "type": args.get('type'),
+            "min_age": args.get('min_age'),
+            "max_age": args.get('max_age'),
+        }
+        limit = args.get('limit')
+        cursor = args.get('cursor')
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.accept_mimetypes.best_match(["application/json", NDJSON]) == NDJSON:
+        return Response(_stream_ndjson(filters, after, limit), mimetype=NDJSON)
+
+    limit = limit or DEFAULT_PAGE_SIZE
+
+    def build_page():
+        pets, next_after = store.page(**filters, after=after, limit=limit)
+        return {
+            "pets": pets,
+            "next_cursor": _encode_cursor(next_after) if next_after is not None else None,
+        }
+
+    key = ("list", filters["type"], filters["min_age"], filters["max_age"], after, limit)
+    return _cached_json(key, build_page)
+
+# Pet payloads are checked with the createPet body schema from the OpenAPI
+# spec, compiled once (the MCP servers run the same checks before sending).
+# _validate_pet(pet) returns (pet, error message); a numeric string age is
+# converted to an integer.
+_validate_pet = compile_schema(
+    PETSTORE_SPEC["paths"]["/pets"]["post"]["requestBody"]["content"]["application/json"]["schema"],
+    name="A pet",
+)
 
 @app.route('/pets', methods=['POST'])
 def create_pet():
     """Create a new pet"""
-    new_pet = request.json
-    
-    # Validate required fields
-    if 'name' not in new_pet or 'type' not in new_pet:
-        return jsonify({"error": "Name and type are required fields"}), 400
-    
-    # Generate a simple ID
-    if not new_pet.get('id'):
-        max_id = max([int(pet['id']) for pet in pets]) if pets else 0
-        new_pet['id'] = str(max_id + 1)
+    new_pet, error = _validate_pet(request.json)
+    if error:
+        return jsonify({"error": error}), 400
     
-    # Ensure age is an integer if provided
-    if 'age' in new_pet and not isinstance(new_pet['age'], int):
-        try:
-            new_pet['age'] = int(new_pet['age'])
-        except (ValueError, TypeError):
-            return jsonify({"error": "Age must be an integer"}), 400
-    
-    pets.append(new_pet)
+    # The store allocates an ID if the client did not supply one
+    try:
+        new_pet = store.add(new_pet)
+    except DuplicatePetError as e:
+        return jsonify({"error": str(e)}), 409
     
     # Return 201 Created status code
     response = make_response(jsonify(new_pet))
     response.status_code = 201
     return response
 
+# Largest number of pets accepted by one POST /pets:batch
+MAX_BATCH_SIZE = 5000
+
+@app.route('/pets:batch', methods=['POST'])
+def create_pets():
+    """Create many pets in one request and one transaction.
+
+    Every pet is validated; the valid ones are stored together. The response
+    has one result per input pet, in order, with its own status code.
+    """
+    body = request.json
+    new_pets = body.get('pets') if isinstance(body, dict) else None
+    if not isinstance(new_pets, list):
+        return jsonify({"error": "Body must be an object with a 'pets' array"}), 400
+    if len(new_pets) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} pets per batch"}), 400
+
+    results = [None] * len(new_pets)
+    valid = []
+    for index, new_pet in enumerate(new_pets):
+        new_pet, error = _validate_pet(new_pet)
+        if error:
+            results[index] = {"index": index, "status": 400, "error": error}
+        else:
+            valid.append((index, new_pet))
+
+    stored = store.add_many([new_pet for _, new_pet in valid])
+    for (index, _), outcome in zip(valid, stored):
+        if isinstance(outcome, DuplicatePetError):
+            results[index] = {"index": index, "status": 409, "error": str(outcome)}
+        else:
+            results[index] = {"index": index, "status": 201, "pet": outcome}
+
+    created = sum(1 for result in results if result["status"] == 201)
+    return jsonify({
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    })
+
 @app.route('/pets/<petId>', methods=['GET'])
 def get_pet(petId):
     """Get a pet by ID"""
-    for pet in pets:
-        if pet['id'] == petId:
-            return jsonify(pet)
+    response = _cached_json(("pet", petId), lambda: store.get(petId))
+    if response is not None:
+        return response
     
     return jsonify({"error": "Pet not found"}), 404
 
@@ -59,6 +263,14 @@ def not_found(e):
 def method_not_allowed(e):
     return jsonify({"error": "Method not allowed"}), 405
 
+@app.errorhandler(PoolExhaustedError)
+def service_busy(e):
+    # Every database connection is busy; ask the client to come back shortly
+    response = jsonify({"error": "Service busy, try again shortly"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
 @app.errorhandler(500)
 def internal_server_error(e):
     return jsonify({"error": "Internal server error"}), 500
@@ -66,9 +278,11 @@ def internal_server_error(e):
 if __name__ == '__main__':
     print("Pet Store API Server")
     print("Running on http://localhost:5000")
+    print("Storage backend:", type(store).__name__)
     print("Endpoints:")
-    print("  GET  /pets - List all pets")
+    print("  GET  /pets - List pets (?type=&min_age=&max_age=&limit=&cursor=)")
     print("  POST /pets - Create a new pet")
+    print("  POST /pets:batch - Create many pets at once")
     print("  GET  /pets/{petId} - Get a pet by ID")
-    print("\nAvailable test pets:", pets)
+    print("\nAvailable test pets:", list(store.find()))
     app.run(debug=True)
\ No newline at end of file
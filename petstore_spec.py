@@ -14,22 +14,77 @@ PETSTORE_SPEC = {
         "/pets": {
             "get": {
                 "operationId": "listPets",
-                "summary": "List all pets",
+                "summary": "List pets, one page at a time",
+                "parameters": [
+                    {
+                        "name": "type",
+                        "in": "query",
+                        "required": False,
+                        "description": "Only return pets of this type",
+                        "schema": {"type": "string"}
+                    },
+                    {
+                        "name": "min_age",
+                        "in": "query",
+                        "required": False,
+                        "description": "Only return pets at least this old",
+                        "schema": {"type": "integer"}
+                    },
+                    {
+                        "name": "max_age",
+                        "in": "query",
+                        "required": False,
+                        "description": "Only return pets at most this old",
+                        "schema": {"type": "integer"}
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "description": "Maximum number of pets to return in this page",
+                        "schema": {"type": "integer", "minimum": 1, "maximum": 1000, "default": 100}
+                    },
+                    {
+                        "name": "cursor",
+                        "in": "query",
+                        "required": False,
+                        "description": "The next_cursor value from the previous page; omit it to start from the beginning",
+                        "schema": {"type": "string"}
+                    }
+                ],
                 "responses": {
                     "200": {
-                        "description": "A list of pets",
+                        "description": "A page of pets. Keep calling with cursor=next_cursor until next_cursor is null.",
                         "content": {
                             "application/json": {
                                 "schema": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "id": {"type": "string"},
-                                            "name": {"type": "string"},
-                                            "type": {"type": "string"},
-                                            "age": {"type": "integer"}
-                                        }
+                                    "type": "object",
+                                    "properties": {
+                                        "pets": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "id": {"type": "string"},
+                                                    "name": {"type": "string"},
+                                                    "type": {"type": "string"},
+                                                    "age": {"type": "integer"}
+                                                }
+                                            }
+                                        },
+                                        "next_cursor": {"type": "string", "nullable": True}
+                                    }
+                                }
+                            },
+                            "application/x-ndjson": {
+                                "schema": {
+                                    "description": "Every matching pet, streamed as one JSON object per line",
+                                    "type": "object",
+                                    "properties": {
+                                        "id": {"type": "string"},
+                                        "name": {"type": "string"},
+                                        "type": {"type": "string"},
+                                        "age": {"type": "integer"}
                                     }
                                 }
                             }
@@ -76,6 +131,78 @@ PETSTORE_SPEC = {
                 }
             }
         },
+        "/pets:batch": {
+            "post": {
+                "operationId": "createPets",
+                "summary": "Create many pets in one call",
+                "description": "Validates and stores up to 5000 pets in a single transaction. Returns one result per pet, in order, each with its own status code (201 created, 400 invalid, 409 duplicate id).",
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "pets": {
+                                        "type": "array",
+                                        "maxItems": 5000,
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {"type": "string"},
+                                                "type": {"type": "string"},
+                                                "age": {"type": "integer"}
+                                            },
+                                            "required": ["name", "type"]
+                                        }
+                                    }
+                                },
+                                "required": ["pets"]
+                            }
+                        }
+                    }
+                },
+                "responses": {
+                    "200": {
+                        "description": "Per-pet results",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "created": {"type": "integer"},
+                                        "failed": {"type": "integer"},
+                                        "results": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "index": {"type": "integer"},
+                                                    "status": {"type": "integer"},
+                                                    "error": {"type": "string"},
+                                                    "pet": {
+                                                        "type": "object",
+                                                        "properties": {
+                                                            "id": {"type": "string"},
+                                                            "name": {"type": "string"},
+                                                            "type": {"type": "string"},
+                                                            "age": {"type": "integer"}
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "400": {
+                        "description": "The body is not a batch or has too many pets"
+                    }
+                }
+            }
+        },
         "/pets/{petId}": {
             "get": {
                 "operationId": "getPet",
@@ -113,3 +240,12 @@ PETSTORE_SPEC = {
         }
     }
 }
+
+# Upstream timeouts (seconds) per operationId, used by upstream_client.py.
+# Batch inserts can take a while; single lookups should be quick.
+PETSTORE_OPERATION_TIMEOUTS = {
+    "listPets": 10.0,
+    "getPet": 5.0,
+    "createPet": 10.0,
+    "createPets": 60.0,
+}
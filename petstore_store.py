@@ -0,0 +1,428 @@
+"""
+Storage backends for the Pet Store service.
+
+The in-memory store keeps pets in a dict keyed by id, hands out ids from a
+monotonic counter and maintains secondary indexes on ``type`` and ``age`` so
+filtered listings never have to scan the whole inventory.
+
+The SQLite store keeps the same data in a WAL-mode database file, so several
+worker processes can serve the API at once and nothing is lost on restart.
+Pick one with ``create_store`` (or the PETSTORE_BACKEND environment variable).
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from itertools import islice
+
+
+class DuplicatePetError(ValueError):
+    """Raised when a pet is created with an id that is already taken."""
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no pooled database connection frees up in time."""
+
+
+class _AgeIndex:
+    """Maps age -> ascending list of seqs, with the distinct ages kept sorted."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.ages = []
+
+    def add(self, age, seq):
+        bucket = self.buckets.get(age)
+        if bucket is None:
+            bucket = self.buckets[age] = []
+            insort(self.ages, age)
+        bucket.append(seq)
+
+    def range(self, min_age, max_age):
+        """Return the seq lists for every age in [min_age, max_age]."""
+        lo = 0 if min_age is None else bisect_left(self.ages, min_age)
+        hi = len(self.ages) if max_age is None else bisect_right(self.ages, max_age)
+        return [self.buckets[age] for age in self.ages[lo:hi]]
+
+
+class InMemoryPetStore:
+    """Pet store backed by plain dicts, with indexes on type and age."""
+
+    def __init__(self, pets=None):
+        self._lock = threading.Lock()
+        self._pets = {}             # id -> pet
+        self._order = []            # seq -> id, in insertion order
+        self._by_type = {}          # type -> [seq, ...] (ascending)
+        self._by_age = _AgeIndex()  # age -> [seq, ...]
+        self._by_type_age = {}      # type -> _AgeIndex, for combined filters
+        self._next_id = 1
+        self._version = 0
+        for pet in pets or ():
+            self.add(pet)
+
+    def __len__(self):
+        return len(self._pets)
+
+    @property
+    def version(self):
+        """A counter that changes whenever a pet is written."""
+        return self._version
+
+    def add(self, pet):
+        """Store a new pet, allocating an id if it has none. Returns the pet."""
+        with self._lock:
+            return self._add(dict(pet))
+
+    def add_many(self, pets):
+        """Store several pets at once.
+
+        Returns one entry per input, in order: the stored pet, or the
+        DuplicatePetError that kept it out. Other pets are still stored.
+        """
+        results = []
+        with self._lock:
+            for pet in pets:
+                try:
+                    results.append(self._add(dict(pet)))
+                except DuplicatePetError as e:
+                    results.append(e)
+        return results
+
+    def _add(self, pet):
+        pet_id = pet.get("id")
+        if pet_id:
+            pet_id = str(pet_id)
+            if pet_id in self._pets:
+                raise DuplicatePetError(f"Pet {pet_id} already exists")
+            # Keep the allocator ahead of any numeric id supplied by a client
+            if pet_id.isdigit():
+                self._next_id = max(self._next_id, int(pet_id) + 1)
+        else:
+            pet_id = str(self._next_id)
+            while pet_id in self._pets:
+                self._next_id += 1
+                pet_id = str(self._next_id)
+            self._next_id += 1
+        pet["id"] = pet_id
+        self._insert(pet)
+        self._version += 1
+        return pet
+
+    def _insert(self, pet):
+        seq = len(self._order)
+        self._order.append(pet["id"])
+        self._pets[pet["id"]] = pet
+
+        pet_type = pet.get("type")
+        self._by_type.setdefault(pet_type, []).append(seq)
+
+        age = pet.get("age")
+        if isinstance(age, int):
+            self._by_age.add(age, seq)
+            type_ages = self._by_type_age.get(pet_type)
+            if type_ages is None:
+                type_ages = self._by_type_age[pet_type] = _AgeIndex()
+            type_ages.add(age, seq)
+
+    def get(self, pet_id):
+        """Return the pet with the given id, or None."""
+        return self._pets.get(pet_id)
+
+    def find(self, type=None, min_age=None, max_age=None):
+        """Yield pets matching the filters, in insertion order.
+
+        Every filter combination is answered from an index, so the cost is
+        proportional to the number of matches rather than the inventory size.
+        Pets without an integer age never match an age filter.
+        """
+        for _, pet in self._scan(type, min_age, max_age, after=None):
+            yield pet
+
+    def page(self, type=None, min_age=None, max_age=None, after=None, limit=100):
+        """Return up to ``limit`` matching pets after position ``after``.
+
+        Returns ``(pets, next_after)``; pass ``next_after`` back in to get the
+        following page. It is None once there are no more matches.
+        """
+        rows = list(islice(self._scan(type, min_age, max_age, after), limit + 1))
+        next_after = rows[limit - 1][0] if len(rows) > limit else None
+        return [pet for _, pet in rows[:limit]], next_after
+
+    def _scan(self, type, min_age, max_age, after):
+        for seq in self._matching_seqs(type, min_age, max_age, after):
+            yield seq, self._pets[self._order[seq]]
+
+    def _matching_seqs(self, type, min_age, max_age, after):
+        start = 0 if after is None else after + 1
+        if min_age is None and max_age is None:
+            if type is None:
+                return range(start, len(self._order))
+            return _tail(self._by_type.get(type, []), start)
+
+        if type is None:
+            ages = self._by_age
+        else:
+            ages = self._by_type_age.get(type)
+            if ages is None:
+                return iter(())
+        return merge(*(_tail(bucket, start) for bucket in ages.range(min_age, max_age)))
+
+
+def _tail(seqs, start):
+    """Iterate the ascending seq list from the first value >= start."""
+    return islice(seqs, bisect_left(seqs, start), None)
+
+
+class _ConnectionPool:
+    """A small per-process pool of SQLite connections.
+
+    Connections are never shared across a fork: if the pool notices it is
+    running in a new process it discards whatever the parent had opened.
+    """
+
+    def __init__(self, path, size=4, timeout=30.0):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,   # we issue BEGIN/COMMIT ourselves
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            idle = self._idle
+            try:
+                conn = idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._created < self.size:
+                    self._created += 1
+                    try:
+                        conn = self._connect()
+                    except BaseException:
+                        self._created -= 1   # don't lose the slot to a failed connect
+                        raise
+        if conn is None:
+            try:
+                conn = idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise PoolExhaustedError(
+                    f"No database connection free after {self.timeout}s ({self.size} in use)"
+                ) from None
+        try:
+            yield conn
+        finally:
+            idle.put(conn)
+
+
+class SqlitePetStore:
+    """Pet store backed by a SQLite database in WAL mode.
+
+    Readers never block on the single writer, and ids come from a counter row
+    that is bumped inside the insert transaction, so any number of worker
+    processes can share one database file without handing out the same id.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pets (
+            seq  INTEGER PRIMARY KEY AUTOINCREMENT,
+            id   TEXT NOT NULL UNIQUE,
+            type TEXT,
+            age  INTEGER,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pets_type ON pets (type, seq);
+        CREATE INDEX IF NOT EXISTS pets_age ON pets (age, seq);
+        CREATE INDEX IF NOT EXISTS pets_type_age ON pets (type, age, seq);
+        CREATE TABLE IF NOT EXISTS meta (
+            key   TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('next_id', 1);
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+    """
+
+    def __init__(self, path="petstore.db", pool_size=4, pets=None):
+        self.path = path
+        self._pool = _ConnectionPool(path, size=pool_size)
+        with self._pool.connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._SCHEMA)
+        for pet in pets or ():
+            try:
+                self.add(pet)
+            except DuplicatePetError:
+                pass  # already seeded by an earlier run or another worker
+
+    def __len__(self):
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT count(*) FROM pets").fetchone()[0]
+
+    @property
+    def version(self):
+        """A counter that changes whenever a pet is written, by any worker."""
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def add(self, pet):
+        """Store a new pet, allocating an id if it has none. Returns the pet."""
+        pet = dict(pet)
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._insert(conn, pet)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return pet
+
+    def add_many(self, pets):
+        """Store several pets in a single transaction.
+
+        Returns one entry per input, in order: the stored pet, or the
+        DuplicatePetError that kept it out. Other pets are still stored.
+        """
+        results = []
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for pet in pets:
+                    pet = dict(pet)
+                    # A savepoint per pet lets one duplicate fail on its own
+                    conn.execute("SAVEPOINT pet")
+                    try:
+                        self._insert(conn, pet)
+                    except DuplicatePetError as e:
+                        conn.execute("ROLLBACK TO pet")
+                        results.append(e)
+                    else:
+                        results.append(pet)
+                    conn.execute("RELEASE pet")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return results
+
+    def _insert(self, conn, pet):
+        pet_id = pet.get("id")
+        if pet_id:
+            pet_id = str(pet_id)
+            if pet_id.isdigit():
+                conn.execute(
+                    "UPDATE meta SET value = max(value, ?) WHERE key = 'next_id'",
+                    (int(pet_id) + 1,),
+                )
+        else:
+            (next_id,) = conn.execute(
+                "UPDATE meta SET value = value + 1 WHERE key = 'next_id' RETURNING value - 1"
+            ).fetchone()
+            pet_id = str(next_id)
+        pet["id"] = pet_id
+
+        age = pet.get("age")
+        try:
+            conn.execute(
+                "INSERT INTO pets (id, type, age, data) VALUES (?, ?, ?, ?)",
+                (pet_id, pet.get("type"), age if isinstance(age, int) else None, json.dumps(pet)),
+            )
+        except sqlite3.IntegrityError:
+            raise DuplicatePetError(f"Pet {pet_id} already exists") from None
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def get(self, pet_id):
+        """Return the pet with the given id, or None."""
+        with self._pool.connection() as conn:
+            row = conn.execute("SELECT data FROM pets WHERE id = ?", (pet_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, type=None, min_age=None, max_age=None, batch_size=500):
+        """Yield pets matching the filters, in insertion order.
+
+        Pets are read ``batch_size`` at a time, each batch resuming after the
+        last seq of the one before, and a pooled connection is only held while
+        a batch is read. A slow or abandoned consumer therefore never ties one
+        up.
+        """
+        after = None
+        while True:
+            pets, after = self.page(type, min_age, max_age, after=after, limit=batch_size)
+            yield from pets
+            if after is None:
+                return
+
+    def page(self, type=None, min_age=None, max_age=None, after=None, limit=100):
+        """Return up to ``limit`` matching pets after position ``after``.
+
+        Returns ``(pets, next_after)``; pass ``next_after`` back in to get the
+        following page. It is None once there are no more matches.
+        """
+        where, params = self._where(type, min_age, max_age, after)
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT seq, data FROM pets {where} ORDER BY seq LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        next_after = rows[limit - 1][0] if len(rows) > limit else None
+        return [json.loads(data) for _, data in rows[:limit]], next_after
+
+    @staticmethod
+    def _where(type, min_age, max_age, after):
+        clauses, params = [], []
+        if type is not None:
+            clauses.append("type = ?")
+            params.append(type)
+        if min_age is not None:
+            clauses.append("age >= ?")
+            params.append(min_age)
+        if max_age is not None:
+            clauses.append("age <= ?")
+            params.append(max_age)
+        if after is not None:
+            clauses.append("seq > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+
+BACKENDS = {
+    "memory": InMemoryPetStore,
+    "sqlite": SqlitePetStore,
+}
+
+
+def create_store(backend=None, pets=None, **options):
+    """Create a pet store.
+
+    ``backend`` defaults to the PETSTORE_BACKEND environment variable, then
+    "memory". The SQLite database path can be set with PETSTORE_DB.
+    """
+    backend = backend or os.getenv("PETSTORE_BACKEND", "memory")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown pet store backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    if backend == "sqlite":
+        options.setdefault("path", os.getenv("PETSTORE_DB", "petstore.db"))
+    return BACKENDS[backend](pets=pets, **options)
@@ -0,0 +1,73 @@
+# python ./petstore_store_bench.py
+"""
+Benchmark for the pet store backends.
+
+Shows per-operation cost of insert, lookup by id and filtered queries as the
+inventory grows from 1k to 1M pets. With the indexed store these numbers
+should stay flat; the old list scan is timed alongside for comparison.
+"""
+import random
+import sys
+import time
+
+from petstore_store import InMemoryPetStore
+
+TYPES = ["cat", "dog", "fish", "bird", "hamster", "rabbit", "lizard", "snake"]
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SAMPLES = 1_000
+
+
+def make_pet(i, rng=random.Random(0)):
+    return {"name": f"pet-{i}", "type": rng.choice(TYPES), "age": rng.randrange(20)}
+
+
+def per_op_us(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def list_scan_get(pets, pet_id):
+    """The original get_pet implementation"""
+    for pet in pets:
+        if pet["id"] == pet_id:
+            return pet
+
+
+def bench(size, rng):
+    store = InMemoryPetStore()
+    for i in range(size - SAMPLES):
+        store.add(make_pet(i))
+
+    # Time the last SAMPLES inserts, once the store is already full
+    insert_us = per_op_us(lambda i: store.add(make_pet(size + i)), SAMPLES)
+
+    ids = [str(rng.randint(1, size)) for _ in range(SAMPLES)]
+    get_us = per_op_us(lambda i: store.get(ids[i]), SAMPLES)
+
+    # A selective query: one type, narrow age band, first page only
+    def query(i):
+        for _ in zip(range(20), store.find(type=TYPES[i % len(TYPES)], min_age=18)):
+            pass
+    query_us = per_op_us(query, SAMPLES)
+
+    # The old list scan only gets a handful of samples; it is O(n)
+    pets = list(store.find())
+    scan_n = 20
+    scan_us = per_op_us(lambda i: list_scan_get(pets, ids[i]), scan_n)
+
+    return insert_us, get_us, query_us, scan_us
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    rng = random.Random(42)
+    print(f"{'pets':>10} {'insert us':>10} {'get us':>10} {'query us':>10} {'list scan us':>13}")
+    for size in sizes:
+        insert_us, get_us, query_us, scan_us = bench(size, rng)
+        print(f"{size:>10} {insert_us:>10.2f} {get_us:>10.2f} {query_us:>10.2f} {scan_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
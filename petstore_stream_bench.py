@@ -0,0 +1,53 @@
+# python ./petstore_stream_bench.py [pets]
+"""
+Peak memory of listing every pet: one buffered JSON array (the old
+GET /pets) against the paged NDJSON stream.
+
+The store is filled first; only memory allocated while producing the listing
+is counted.
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+import petstore_service
+from petstore_service import _stream_ndjson
+
+TYPES = ["cat", "dog", "fish", "bird"]
+FILTERS = {"type": None, "min_age": None, "max_age": None}
+
+
+def buffered():
+    return len(json.dumps(list(petstore_service.store.find())))
+
+
+def streamed():
+    return sum(len(chunk) for chunk in _stream_ndjson(FILTERS, after=None, limit=None))
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    store = petstore_service.store
+    for i in range(count):
+        store.add({"name": f"pet-{i}", "type": TYPES[i % len(TYPES)], "age": i % 15})
+
+    print(f"{len(store)} pets")
+    print(f"{'mode':>10} {'bytes out':>12} {'seconds':>8} {'peak MiB':>9}")
+    for name, fn in [("buffered", buffered), ("ndjson", streamed)]:
+        size, elapsed, peak = measure(fn)
+        print(f"{name:>10} {size:>12} {elapsed:>8.2f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
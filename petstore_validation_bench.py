@@ -0,0 +1,128 @@
+# python ./petstore_validation_bench.py
+"""
+Cost of request validation for the Pet Store tools.
+
+Part one times a single check: the compiled validators from
+openapi_validation.py, the hand-written check petstore_service used before
+and, when it is installed, jsonschema over the same schema.
+
+Part two calls the MCP tools in memory (petstore_server_basic) against the
+Flask app served from a thread, with upstream validation on and off. It
+reports the p50 latency of a valid createPet (which pays for the check) and
+an invalid one (which the check answers without an HTTP round trip).
+"""
+import asyncio
+import logging
+import os
+import statistics
+import time
+import timeit
+
+from openapi_validation import compile_operations
+from petstore_spec import PETSTORE_SPEC
+
+CALLS = 300
+
+VALID_PET = {"name": "Rex", "type": "dog", "age": 5}
+INVALID_PET = {"name": "Rex", "age": "old"}
+BATCH = {"pets": [dict(VALID_PET, name=f"pet-{i}") for i in range(100)]}
+
+
+def handwritten(new_pet):
+    """petstore_service's _validate_pet before the compiled validators."""
+    if not isinstance(new_pet, dict):
+        return None, "A pet must be a JSON object"
+    if 'name' not in new_pet or 'type' not in new_pet:
+        return None, "Name and type are required fields"
+    if 'age' in new_pet and not isinstance(new_pet['age'], int):
+        try:
+            new_pet['age'] = int(new_pet['age'])
+        except (ValueError, TypeError):
+            return None, "Age must be an integer"
+    return new_pet, None
+
+
+def per_call_us(fn, number=20000):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def micro():
+    validators = compile_operations(PETSTORE_SPEC)
+    create_pet, create_pets, list_pets = validators["createPet"], validators["createPets"], validators["listPets"]
+    cases = {
+        # the body check alone, as petstore_service runs it
+        "valid pet": (lambda: create_pet.body(dict(VALID_PET)), lambda: handwritten(dict(VALID_PET)),
+                      create_pet.body_schema, VALID_PET),
+        "invalid pet": (lambda: create_pet.body(dict(INVALID_PET)), lambda: handwritten(dict(INVALID_PET)),
+                        create_pet.body_schema, INVALID_PET),
+        # parameters and body, as the upstream transport runs it
+        "createPet call": (lambda: create_pet.validate({}, {}, dict(VALID_PET)), None, None, None),
+        "listPets query": (lambda: list_pets.validate({}, {"type": "cat", "limit": "20"}), None, None, None),
+        "batch of 100": (lambda: create_pets.validate({}, {}, BATCH), None, create_pets.body_schema, BATCH),
+    }
+    try:
+        import jsonschema
+    except ImportError:
+        jsonschema = None
+
+    print(f"{'check':<16} {'compiled us':>12} {'handwritten us':>15} {'jsonschema us':>14}")
+    for name, (compiled, manual, schema, value) in cases.items():
+        row = [per_call_us(compiled)]
+        row.append(per_call_us(manual) if manual else None)
+        if jsonschema is not None and schema is not None:
+            validator = jsonschema.Draft7Validator(schema)
+            row.append(per_call_us(lambda: next(validator.iter_errors(value), None), number=2000))
+        else:
+            row.append(None)
+        print(f"{name:<16}" + "".join(
+            f" {value:>{width}.2f}" if value is not None else f" {'-':>{width}}"
+            for value, width in zip(row, (12, 15, 14))
+        ))
+
+
+async def end_to_end():
+    from fastmcp import Client
+    from mcp_bench import start_petstore_standin
+
+    os.environ["PETSTORE_BASE_URL"] = start_petstore_standin(pets=100)
+    import petstore_server_basic
+
+    # fastmcp logs every failed tool call with a rich traceback, which takes
+    # far longer to render than the call itself and would hide the difference
+    # (set after the import: creating a server configures this logger)
+    logging.getLogger("FastMCP").setLevel(logging.CRITICAL)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    transport = petstore_server_basic.api_client.upstream
+    compiled = transport.validators
+
+    async def p50(args):
+        times = []
+        for _ in range(CALLS):
+            start = time.perf_counter()
+            try:
+                await client.call_tool("createPet", args)
+            except Exception:
+                pass   # the invalid pet is meant to fail
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    print(f"\n{'createPet':<10} {'validation':<11} {'p50 ms':>8} {'upstream requests':>18}")
+    async with Client(petstore_server_basic.mcp) as client:
+        for label, args in (("valid", VALID_PET), ("invalid", INVALID_PET)):
+            for enabled in (False, True):
+                transport.validators = compiled if enabled else {}
+                before = transport.requests
+                await p50(args)   # warm up
+                latency = await p50(args)
+                sent = (transport.requests - before) // 2
+                print(f"{label:<10} {'on' if enabled else 'off':<11} {latency:>8.2f} {sent:>18}")
+
+
+def main():
+    micro()
+    asyncio.run(end_to_end())
+
+
+if __name__ == "__main__":
+    main()
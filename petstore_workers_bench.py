@@ -0,0 +1,76 @@
+# python ./petstore_workers_bench.py [seconds]
+"""
+Throughput of the SQLite pet store with 1, 2, 4 and 8 worker processes.
+
+Each worker opens its own store (and so its own connection pool) on a shared
+database file and runs a read-heavy mix of get / filtered find / add for a
+fixed time. Afterwards every id that was handed out is checked for
+collisions across workers.
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from petstore_store import SqlitePetStore
+
+TYPES = ["cat", "dog", "fish", "bird"]
+WORKER_COUNTS = [1, 2, 4, 8]
+PRELOAD = 10_000
+
+
+def worker(path, seconds, seed, results):
+    rng = random.Random(seed)
+    store = SqlitePetStore(path, pool_size=1)
+    created, ops = [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < 0.8:
+            store.get(str(rng.randint(1, PRELOAD)))
+        elif roll < 0.9:
+            for _ in zip(range(20), store.find(type=rng.choice(TYPES), min_age=rng.randrange(10))):
+                pass
+        else:
+            pet = store.add({"name": "bench", "type": rng.choice(TYPES), "age": rng.randrange(15)})
+            created.append(pet["id"])
+        ops += 1
+    results.put((ops, created))
+
+
+def run(workers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pets.db")
+        store = SqlitePetStore(path)
+        for i in range(PRELOAD):
+            store.add({"name": f"pet-{i}", "type": TYPES[i % len(TYPES)], "age": i % 15})
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=worker, args=(path, seconds, seed, results))
+            for seed in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        outcomes = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+    total_ops = sum(ops for ops, _ in outcomes)
+    ids = [pet_id for _, created in outcomes for pet_id in created]
+    collisions = len(ids) - len(set(ids))
+    return total_ops / seconds, len(ids), collisions
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'workers':>8} {'ops/s':>10} {'inserts':>8} {'id collisions':>14}")
+    for workers in WORKER_COUNTS:
+        throughput, inserts, collisions = run(workers, seconds)
+        print(f"{workers:>8} {throughput:>10.0f} {inserts:>8} {collisions:>14}")
+
+
+if __name__ == "__main__":
+    main()
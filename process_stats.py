@@ -0,0 +1,19 @@
+"""
+Resource numbers for the current process, shared by the gateway's status
+resource and the benchmarks.
+"""
+import sys
+
+
+def rss_mb():
+    """Resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # peak rather than current, where /proc isn't available
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
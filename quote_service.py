@@ -0,0 +1,161 @@
+"""
+Stock quotes served from a background-refreshed snapshot.
+
+QuoteService keeps the latest price of every watched ticker in memory. A
+background task refreshes the whole watched set every ``interval`` seconds
+with a single batched request to the source, so tool calls read the
+snapshot instead of going upstream. A quote older than ``max_staleness``
+(or a ticker never seen before) is fetched on demand, and the ticker is
+watched from then on if the source knows it.
+
+A source is any object with ``async fetch(tickers) -> {ticker: price}``;
+tickers it doesn't know are left out. StubQuoteSource is the local one used
+by default and in tests.
+"""
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICES = {"AAPL": 180.50, "GOOG": 140.20}
+
+
+class StubQuoteSource:
+    """In-process quote source; prices optionally drift by ``jitter`` per fetch."""
+
+    def __init__(self, prices=None, jitter=0.0, latency=0.0):
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.jitter = jitter
+        self.latency = latency
+        self.requests = 0
+
+    async def fetch(self, tickers):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        quotes = {}
+        for ticker in tickers:
+            if ticker in self.prices:
+                if self.jitter:
+                    self.prices[ticker] = round(self.prices[ticker] * (1 + random.uniform(-self.jitter, self.jitter)), 2)
+                quotes[ticker] = self.prices[ticker]
+        return quotes
+
+
+class QuoteService:
+    def __init__(self, source, interval=5.0, max_staleness=30.0, watch=()):
+        self.source = source
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self._watched = {ticker.upper() for ticker in watch}
+        self._snapshot = {}   # ticker -> (price or None if unknown, fetched_at)
+        self._task = None
+        self._users = 0
+        self._fetch_lock = asyncio.Lock()
+        # metrics
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.on_demand_fetches = 0
+        self.snapshot_reads = 0
+        self.last_error = None
+
+    # Background refresh
+
+    async def start(self):
+        """Start the refresh task; nested start/stop pairs share one task."""
+        self._users += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._users -= 1
+        if self._users <= 0 and self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._users = 0
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the last snapshot; reads past max_staleness refetch
+                self.refresh_errors += 1
+                self.last_error = str(e)
+                logger.warning("Quote refresh failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self):
+        """Fetch every watched ticker in one request."""
+        if self._watched:
+            await self._fetch(sorted(self._watched))
+        self.refreshes += 1
+
+    async def _fetch(self, tickers):
+        quotes = await self.source.fetch(tickers)
+        now = time.monotonic()
+        for ticker in tickers:
+            # Unknown tickers are remembered too, so they don't refetch on every read
+            price = quotes.get(ticker)
+            self._snapshot[ticker] = (None if price is None else float(price), now)
+        return quotes
+
+    # Reads
+
+    async def get_many(self, tickers):
+        """Return {ticker: {"price", "age"}} for tickers; price is None if unknown.
+
+        The snapshot can still lack a ticker if the source failed mid-read;
+        that error propagates to the caller.
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        now = time.monotonic()
+        missing = [
+            ticker for ticker in tickers
+            if ticker not in self._snapshot or now - self._snapshot[ticker][1] > self.max_staleness
+        ]
+        if missing:
+            async with self._fetch_lock:
+                # Another caller may have fetched these while we waited
+                now = time.monotonic()
+                missing = [
+                    ticker for ticker in missing
+                    if ticker not in self._snapshot or now - self._snapshot[ticker][1] > self.max_staleness
+                ]
+                if missing:
+                    self.on_demand_fetches += 1
+                    # Keep refreshing what the source knows; unknown tickers aren't watched
+                    self._watched.update(await self._fetch(missing))
+        self.snapshot_reads += len(tickers)
+
+        now = time.monotonic()
+        result = {}
+        for ticker in tickers:
+            price, fetched_at = self._snapshot[ticker]
+            result[ticker] = {"price": price, "age": round(now - fetched_at, 3)}
+        return result
+
+    async def get(self, ticker):
+        return (await self.get_many([ticker]))[ticker.upper()]
+
+    def stats(self):
+        now = time.monotonic()
+        ages = [now - fetched_at for price, fetched_at in self._snapshot.values() if price is not None]
+        return {
+            "watched": sorted(self._watched),
+            "interval": self.interval,
+            "max_staleness": self.max_staleness,
+            "running": self._task is not None,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "last_error": self.last_error,
+            "on_demand_fetches": self.on_demand_fetches,
+            "snapshot_reads": self.snapshot_reads,
+            "oldest_quote_age": round(max(ages), 3) if ages else None,
+        }
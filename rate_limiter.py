@@ -0,0 +1,101 @@
+"""
+Token-bucket rate limiting with a bounded wait queue.
+
+Callers ``await limiter.acquire()`` before each upstream request. Tokens
+refill at ``rate`` per second up to ``burst``. When none are left callers
+queue in FIFO order, but only up to ``max_queue`` of them and only if their
+expected wait fits within ``max_wait`` seconds; anyone else is shed straight
+away with OverloadedError rather than piling up.
+"""
+import asyncio
+import time
+
+
+class OverloadedError(Exception):
+    """Raised when a request is shed instead of queued."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"overloaded ({reason}), retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def as_dict(self):
+        return {"error": "overloaded", "reason": self.reason, "retry_after": round(self.retry_after, 2)}
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate, burst=1, max_queue=100, max_wait=10.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()   # FIFO: waiters take tokens in arrival order
+        self._waiting = 0
+        # metrics
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "deadline": 0}
+        self.max_queue_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _shed(self, reason, retry_after):
+        self.shed[reason] += 1
+        raise OverloadedError(reason, retry_after)
+
+    def _admit(self, waited):
+        self.admitted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    async def acquire(self):
+        """Wait for a token, or raise OverloadedError if that would take too long."""
+        self._refill()
+        if self._waiting == 0 and self._tokens >= 1:
+            self._tokens -= 1
+            self._admit(0.0)
+            return
+
+        expected_wait = (self._waiting + 1 - self._tokens) / self.rate
+        if self._waiting >= self.max_queue:
+            self._shed("queue_full", expected_wait)
+        if expected_wait > self.max_wait:
+            self._shed("deadline", expected_wait)
+
+        self._waiting += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._waiting)
+        started = time.monotonic()
+        try:
+            async with self._lock:
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+        self._admit(time.monotonic() - started)
+
+    def stats(self):
+        self._refill()
+        return {
+            "rate_per_sec": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "queue_depth": self._waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "wait_ms": {
+                "avg": self._wait_total / self.admitted * 1000 if self.admitted else 0.0,
+                "max": self._wait_max * 1000,
+            },
+        }
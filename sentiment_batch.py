@@ -0,0 +1,231 @@
+"""
+Batched, memoized sentiment classification via client-side LLM sampling.
+
+Each ctx.sample call is a full round trip to the client's LLM, so instead of
+one request per text we number the texts, send up to ``batch_size`` of them in
+one prompt and ask for a JSON array of verdicts back. Anything the model
+leaves out or garbles is retried one text at a time.
+
+Verdicts are cached by a hash of the (whitespace- and case-normalized) text,
+so repeated texts never reach the LLM again.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a sentiment classifier. For each numbered text, decide whether its "
+    "sentiment is positive, negative or neutral. Reply with only a JSON array, one "
+    'object per text, like [{"id": 1, "sentiment": "positive"}]. No other output.'
+)
+
+# Reply budget for a batch: each {"id": 12, "sentiment": "positive"} is about
+# 15 tokens, more once the model pretty-prints the array, plus a code fence
+BATCH_TOKENS_PER_ITEM = 40
+BATCH_TOKENS_OVERHEAD = 64
+
+SINGLE_PROMPT = (
+    "Analyze the sentiment of the following text as positive, negative, or neutral. "
+    "Just output a single word - 'positive', 'negative', or 'neutral'. Text to analyze: {text}"
+)
+
+
+def parse_label(reply):
+    """Map a free-form reply to one of SENTIMENTS."""
+    reply = reply.strip().lower()
+    if "positive" in reply:
+        return "positive"
+    if "negative" in reply:
+        return "negative"
+    return "neutral"
+
+
+def content_key(text):
+    """Cache key for a text: hash of its normalized content."""
+    normalized = " ".join(text.split()).lower()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SentimentCache:
+    """LRU map of content_key -> verdict."""
+
+    def __init__(self, maxsize=10_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def set(self, key, verdict):
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def build_batch_prompt(texts):
+    return "\n\n".join(f"[{i}] {text}" for i, text in enumerate(texts, 1))
+
+
+def parse_batch_reply(reply, count):
+    """Pull {id: sentiment} out of a batch reply; ids are 1-based.
+
+    Accepts the requested JSON array (possibly wrapped in prose or a code
+    fence). If the array doesn't parse, say because the reply was cut off,
+    the complete objects in it are still used. Failing that, it falls back to
+    "<id>: <sentiment>" lines.
+    """
+    verdicts = {}
+    start = reply.find("[")
+    if start != -1:
+        end = reply.rfind("]")
+        items = None
+        if end > start:
+            try:
+                items = json.loads(reply[start:end + 1])
+            except ValueError:
+                pass
+        if not isinstance(items, list):
+            items = []
+            for match in re.finditer(r"\{[^{}]*\}", reply[start:]):
+                try:
+                    items.append(json.loads(match.group()))
+                except ValueError:
+                    continue
+        for item in items:
+            if isinstance(item, dict):
+                try:
+                    i = int(item.get("id"))
+                except (TypeError, ValueError):
+                    continue
+                label = str(item.get("sentiment", "")).strip().lower()
+                if 1 <= i <= count and label in SENTIMENTS:
+                    verdicts[i] = label
+    if not verdicts:
+        for match in re.finditer(r"\[?(\d+)\]?\s*[:.)-]\s*(positive|negative|neutral)", reply, re.I):
+            i = int(match.group(1))
+            if 1 <= i <= count:
+                verdicts[i] = match.group(2).lower()
+    return verdicts
+
+
+class SentimentBatcher:
+    """Classifies lists of texts with as few sampling requests as possible.
+
+    ``sample(messages, system_prompt=None, max_tokens=None)`` is ctx.sample or
+    anything with the same shape.
+    """
+
+    def __init__(self, cache=None, batch_size=20, max_batch_chars=8000, concurrency=4):
+        self.cache = cache if cache is not None else SentimentCache()
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.concurrency = concurrency
+        self.sampling_requests = 0
+        self.batch_misses = 0   # items a batch reply left out, retried alone
+
+    def _batches(self, texts):
+        """Split {key: text} into batches by count and total length."""
+        batch, chars = [], 0
+        for key, text in texts.items():
+            size = len(text)
+            if batch and (len(batch) >= self.batch_size or chars + size > self.max_batch_chars):
+                yield batch
+                batch, chars = [], 0
+            batch.append(key)
+            chars += size
+        if batch:
+            yield batch
+
+    async def _sample_one(self, key, text, sample):
+        self.sampling_requests += 1
+        response = await sample(SINGLE_PROMPT.format(text=text))
+        verdict = parse_label(response.text)
+        self.cache.set(key, verdict)
+        return verdict
+
+    async def classify_one(self, text, sample):
+        key = content_key(text)
+        verdict = self.cache.get(key)
+        if verdict is None:
+            verdict = await self._sample_one(key, text, sample)
+        return verdict
+
+    async def classify(self, texts, sample):
+        """Return ([(sentiment, cached)] for texts in order, sampling requests made)."""
+        keys = [content_key(text) for text in texts]
+        verdicts, cached = {}, set()
+        pending = {}   # key -> text, deduplicated
+        for key, text in zip(keys, texts):
+            if key in verdicts or key in pending:
+                continue
+            verdict = self.cache.get(key)
+            if verdict is None:
+                pending[key] = text
+            else:
+                verdicts[key] = verdict
+                cached.add(key)
+
+        limit = asyncio.Semaphore(self.concurrency)
+        requests = 0
+
+        async def run_batch(batch):
+            nonlocal requests
+            async with limit:
+                requests += 1
+                if len(batch) == 1:
+                    verdicts[batch[0]] = await self._sample_one(batch[0], pending[batch[0]], sample)
+                    return
+                self.sampling_requests += 1
+                response = await sample(
+                    build_batch_prompt([pending[key] for key in batch]),
+                    system_prompt=BATCH_SYSTEM_PROMPT,
+                    max_tokens=BATCH_TOKENS_OVERHEAD + BATCH_TOKENS_PER_ITEM * len(batch),
+                )
+                answers = parse_batch_reply(response.text, len(batch))
+            for i, key in enumerate(batch, 1):
+                if i in answers:
+                    verdicts[key] = answers[i]
+                    self.cache.set(key, answers[i])
+                else:
+                    self.batch_misses += 1
+                    async with limit:
+                        requests += 1
+                        verdicts[key] = await self._sample_one(key, pending[key], sample)
+
+        await asyncio.gather(*(run_batch(batch) for batch in self._batches(pending)))
+        return [(verdicts[key], key in cached) for key in keys], requests
+
+    def stats(self):
+        return {
+            **self.cache.stats(),
+            "sampling_requests": self.sampling_requests,
+            "batch_misses": self.batch_misses,
+        }
@@ -1,10 +1,47 @@
-import httpx
+import os
+from contextlib import asynccontextmanager
+
 from pydantic import BaseModel
 from fastmcp import Context, FastMCP
 from fastmcp.prompts import Message,UserMessage, AssistantMessage
 
+from memoize import enable_memoization, memoize
+from notification_queue import NotificationQueue, PrintSender
+from quote_service import QuoteService, StubQuoteSource
+
+# Quotes come from a snapshot refreshed in the background; reads never wait
+# on the source unless a quote is older than QUOTE_MAX_STALENESS seconds.
+# Swap StubQuoteSource for a real feed with the same async fetch(tickers).
+quotes = QuoteService(
+    StubQuoteSource(),
+    interval=float(os.getenv("QUOTE_REFRESH_INTERVAL", 5)),
+    max_staleness=float(os.getenv("QUOTE_MAX_STALENESS", 30)),
+    watch=os.getenv("QUOTE_WATCH", "AAPL,GOOG").split(","),
+)
+
+# Notifications are delivered by background workers, batched per user, so
+# send_notification only has to enqueue them
+notifications = NotificationQueue(
+    PrintSender(),
+    workers=int(os.getenv("NOTIFY_WORKERS", 2)),
+    max_queue=int(os.getenv("NOTIFY_QUEUE_SIZE", 10_000)),
+    batch_size=int(os.getenv("NOTIFY_BATCH_SIZE", 100)),
+    max_retries=int(os.getenv("NOTIFY_MAX_RETRIES", 3)),
+)
+
+@asynccontextmanager
+async def lifespan(server):
+    """Run the quote refresher and notification workers while the server is up."""
+    await quotes.start()
+    await notifications.start()
+    try:
+        yield
+    finally:
+        await notifications.stop()
+        await quotes.stop()
+
 # Create the MCP server
-mcp = FastMCP("tinker")
+mcp = FastMCP("tinker", lifespan=lifespan)
 
 # supporting classes
 class UserInfo(BaseModel):
@@ -40,31 +77,59 @@ def debug_session_start(error_message: str) -> list[Message]:
 
 # tools
 @mcp.tool()
+@memoize(maxsize=1024)
 def add(a: int, b: int) -> int:
     """Add two numbers"""
     return a + b
 
 # Add a dynamic greeting resource
 @mcp.resource("greeting://{name}")
+@memoize(maxsize=1024)
 def get_greeting(name: str) -> str:
     """Get a personalized greeting"""
     return f"Hello, {name}!"
 
 @mcp.tool()
 async def send_notification(user: UserInfo, message: str) -> dict:
-    """Sends a notification to a user if requested."""
+    """Sends a notification to a user if requested.
+
+    Delivery happens in the background: status is "queued" once accepted, or
+    "rejected" if the delivery queue is full or isn't running.
+    """
     if user.notify:
-        # Simulate sending notification
-        print(f"Notifying user {user.user_id}: {message}")
-        return {"status": "sent", "user_id": user.user_id}
+        try:
+            queued = notifications.submit(user.user_id, message)
+        except RuntimeError:
+            return {"status": "rejected", "reason": "not_running", "user_id": user.user_id}
+        if queued:
+            return {"status": "queued", "user_id": user.user_id}
+        return {"status": "rejected", "reason": "queue_full", "user_id": user.user_id}
     return {"status": "skipped", "user_id": user.user_id}
 
+@mcp.resource("notifications://status")
+def get_notification_status() -> dict:
+    """Queue depth, throughput and failures of notification delivery."""
+    return notifications.stats()
+
 @mcp.tool()
-def get_stock_price(ticker: str) -> float:
+async def get_stock_price(ticker: str) -> float:
     """Gets the current price for a stock ticker."""
-    # Replace with actual API call
-    prices = {"AAPL": 180.50, "GOOG": 140.20}
-    return prices.get(ticker.upper(), 0.0)
+    quote = await quotes.get(ticker)
+    return quote["price"] if quote["price"] is not None else 0.0
+
+@mcp.tool()
+async def get_stock_prices(tickers: list[str]) -> dict:
+    """Gets current prices for many tickers at once.
+
+    Returns {ticker: {"price", "age"}}, age being seconds since the quote was
+    fetched; price is null for tickers the source doesn't know.
+    """
+    return await quotes.get_many(tickers)
+
+@mcp.resource("quotes://stats")
+def get_quote_stats() -> dict:
+    """Refresh counters and snapshot age of the quote service."""
+    return quotes.stats()
 
 
 
@@ -72,6 +137,7 @@ def get_stock_price(ticker: str) -> float:
 # resource templates
 # This is a resource template (dynamic resource)
 @mcp.resource("db://users/{user_id}/email")
+@memoize(ttl=60, maxsize=1024)  # a real user table can change
 def get_user_email(user_id: str) -> str:
     """Retrieves the email address for a given user ID."""
     emails = {"123": "alice@example.com", "456": "bob@example.com"}
@@ -82,3 +148,5 @@ def get_app_version() -> str:
     """Returns the application version."""
     return "v2.1.0"
 
+# Serve the @memoize'd tools and resources above from cache
+enable_memoization(mcp)
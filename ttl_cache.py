@@ -0,0 +1,123 @@
+"""
+Small in-process caches with time-to-live and LRU bounds.
+
+TTLCache is a plain synchronous cache. AsyncTTLCache adds single-flight
+loading: concurrent misses for the same key share one fetch instead of each
+going upstream.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TTLCache:
+    """An LRU mapping whose entries expire ``ttl`` seconds after being set.
+
+    ``clock`` defaults to time.monotonic; pass time.time if expiry times are
+    persisted and must survive a restart.
+    """
+
+    def __init__(self, ttl, maxsize=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (value, expires_at)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=MISSING):
+        """Return the cached value, or ``default`` if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None, expires_at=None):
+        if expires_at is None:
+            expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def items(self):
+        """Yield (key, value, expires_at) for every live entry."""
+        now = self.clock()
+        for key, (value, expires_at) in list(self._entries.items()):
+            if expires_at > now:
+                yield key, value, expires_at
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class AsyncTTLCache(TTLCache):
+    """TTLCache with single-flight loading for async fetch functions."""
+
+    def __init__(self, ttl, maxsize=1024, clock=time.monotonic):
+        super().__init__(ttl, maxsize, clock)
+        self.coalesced = 0
+        self._inflight = {}   # key -> Task
+
+    async def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling ``await fetch()`` on a miss.
+
+        While a fetch is running, other callers asking for the same key wait
+        for it rather than starting their own. The fetch runs in its own task,
+        so a caller that is cancelled stops waiting without cancelling it for
+        the others. Failures are not cached.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.create_task(self._load(key, fetch))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key, fetch):
+        try:
+            value = await fetch()
+            self.set(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def stats(self):
+        return {**super().stats(), "coalesced": self.coalesced, "inflight": len(self._inflight)}
+
+
+def _retrieve_exception(task):
+    # Every waiter may have been cancelled; don't warn about an unseen failure
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,392 @@
+"""
+Shared upstream HTTP client for the OpenAPI-backed MCP servers.
+
+``create_upstream_client`` builds an httpx.AsyncClient with:
+
+- a sized connection pool (optionally HTTP/2, which needs the ``h2`` package)
+- per-operationId timeouts, looked up from the OpenAPI spec paths
+- bounded retries with full jitter for idempotent requests
+- a circuit breaker that fails fast while the upstream is down
+- ETag revalidation of GET responses (see http_cache.py)
+- requests checked against the spec's parameter and body schemas (see
+  openapi_validation.py); an invalid one gets a local 400 without an HTTP
+  round trip
+
+The transport keeps pool and request statistics; call ``client.stats()`` (or
+``upstream_stats(client)``) to see in-use / idle connections, how many
+requests are waiting for one, how long they waited for the pool and how long
+new connections took to open. The counts come from httpcore's request trace
+events: a connection is in use from sending the request headers until the
+response is closed (so while the body is read, too). Connections the server
+drops while idle are only noticed when the pool next needs one; with HTTP/2
+the counts are of streams rather than connections.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import httpx
+
+from http_cache import ETagCacheTransport
+from openapi_validation import compile_operations
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUSES = {502, 503, 504}
+
+
+@dataclass
+class UpstreamConfig:
+    """Settings for one upstream API."""
+    base_url: str = "http://localhost:5000"
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 10.0
+    # operationId -> timeout in seconds, overriding ``timeout``
+    operation_timeouts: dict[str, float] = field(default_factory=dict)
+    # extra attempts for idempotent requests after a connection error or 502/503/504
+    retries: int = 2
+    backoff: float = 0.1
+    max_backoff: float = 2.0
+    # consecutive failures that open the circuit, and how long it stays open
+    breaker_failures: int = 5
+    breaker_reset: float = 30.0
+    etag_cache: bool = True
+    # reject requests that don't match the spec before sending them
+    validate_requests: bool = True
+
+    @classmethod
+    def from_env(cls, prefix, **defaults):
+        """Build a config from PREFIX_* environment variables, e.g. PETSTORE_BASE_URL."""
+        config = cls(**defaults)
+        casts = {
+            "base_url": str,
+            "max_connections": int,
+            "max_keepalive_connections": int,
+            "keepalive_expiry": float,
+            "http2": lambda value: value.lower() in ("1", "true", "yes"),
+            "timeout": float,
+            "retries": int,
+            "breaker_failures": int,
+            "breaker_reset": float,
+            "validate_requests": lambda value: value.lower() in ("1", "true", "yes"),
+        }
+        for name, cast in casts.items():
+            value = os.getenv(f"{prefix}_{name.upper()}")
+            if value:
+                setattr(config, name, cast(value))
+        return config
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open probe after a delay."""
+
+    def __init__(self, failures=5, reset_after=30.0):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+
+    def allow(self):
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_after:
+                return False
+            self.state = "half-open"   # let one probe through
+            return True
+        if self.state == "half-open":
+            return False               # a probe is already in flight
+        return True
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_abandoned(self):
+        """A request ended without an answer either way (cancelled, or an
+        unexpected error). If it was the half-open probe, count it as a
+        failure, otherwise nothing would ever close or reopen the circuit."""
+        if self.state == "half-open":
+            self.record_failure()
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half-open" or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class OperationMatcher:
+    """Maps (method, path) of an outgoing request back to its OpenAPI operationId."""
+
+    def __init__(self, spec, base_url=""):
+        self._prefix = urlparse(base_url).path.rstrip("/")
+        self._routes = []
+        for path, item in spec.get("paths", {}).items():
+            parts = re.split(r"(\{[^}]+\})", path)
+            regex = "".join(
+                f"(?P<{part[1:-1]}>[^/]+)" if part.startswith("{") else re.escape(part)
+                for part in parts
+            )
+            for method, operation in item.items():
+                if isinstance(operation, dict) and "operationId" in operation:
+                    self._routes.append((method.upper(), re.compile(f"^{regex}$"), operation["operationId"]))
+
+    def match(self, method, path):
+        """Return (operationId, path parameters), or (None, {}) if nothing matches."""
+        if self._prefix and path.startswith(self._prefix):
+            path = path[len(self._prefix):]
+        for route_method, regex, operation_id in self._routes:
+            if route_method == method:
+                match = regex.match(path)
+                if match:
+                    return operation_id, match.groupdict()
+        return None, {}
+
+
+class UpstreamTransport(httpx.AsyncBaseTransport):
+    """Adds per-operation timeouts, retries and a circuit breaker to a transport."""
+
+    def __init__(self, transport, config, spec=None):
+        self._transport = transport
+        self.config = config
+        self.matcher = OperationMatcher(spec or {}, config.base_url)
+        self.breaker = CircuitBreaker(config.breaker_failures, config.breaker_reset)
+        # Array items aren't checked: batch endpoints report invalid items one
+        # by one, so a single bad item mustn't reject the whole request here
+        self.validators = compile_operations(spec or {}, items=False) if config.validate_requests else {}
+        self.requests = 0
+        self.rejected = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.in_use = 0      # connections checked out of the pool
+        self.waiting = 0     # requests waiting for one
+        self._idle = deque()   # when each idle connection went back to the pool
+        self._timings = {"pool_wait": [0, 0.0, 0.0], "connect": [0, 0.0, 0.0]}   # count, total, max
+
+    async def handle_async_request(self, request):
+        operation_id, path_params = self.matcher.match(request.method, request.url.path)
+        validator = self.validators.get(operation_id)
+        if validator is not None:
+            error = self._validate(validator, request, path_params)
+            if error:
+                self.rejected += 1
+                return httpx.Response(400, json={"error": error}, request=request)
+
+        timeout = self.config.operation_timeouts.get(operation_id)
+        if timeout is not None:
+            request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+
+        attempts = 1 + (self.config.retries if request.method in IDEMPOTENT_METHODS else 0)
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                self.short_circuited += 1
+                raise CircuitOpenError(
+                    f"Circuit open for {self.config.base_url}; not sending {operation_id or request.url.path}",
+                    request=request,
+                )
+            self.requests += 1
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await self._send(request)
+            except httpx.TransportError:
+                self.failures += 1
+                self.breaker.record_failure()
+                if last_attempt:
+                    raise
+            except BaseException:
+                self.breaker.record_abandoned()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.failures += 1
+                self.breaker.record_failure()
+                if last_attempt:
+                    return response
+                await response.aclose()
+
+            self.retries += 1
+            ceiling = min(self.config.max_backoff, self.config.backoff * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, ceiling))
+
+    @staticmethod
+    def _validate(validator, request, path_params):
+        body = None
+        if request.content:
+            if "json" not in request.headers.get("content-type", ""):
+                return None   # only JSON bodies are described by the spec
+            try:
+                body = json.loads(request.content)
+            except ValueError:
+                return "request body is not valid JSON"
+        return validator.validate(path_params, dict(request.url.params), body)
+
+    async def _send(self, request):
+        """Send once, following the connection through the pool's trace events."""
+        started = time.perf_counter()
+        connecting = acquired = None
+        released = False
+        keep_alive = True    # no "Connection: close" from the server
+        body_read = False    # httpcore drops a connection closed mid-body
+        previous_trace = request.extensions.get("trace")
+
+        def restore_trace():
+            if previous_trace is None:
+                request.extensions.pop("trace", None)
+            else:
+                request.extensions["trace"] = previous_trace
+
+        def release(reusable):
+            nonlocal released
+            released = True
+            self.in_use -= 1
+            if reusable and len(self._idle) < self.config.max_keepalive_connections:
+                self._idle.append(time.monotonic())
+            restore_trace()
+
+        async def trace(event_name, info):
+            nonlocal connecting, acquired, keep_alive, body_read
+            now = time.perf_counter()
+            if event_name == "connection.connect_tcp.started" and connecting is None:
+                # the pool had nothing to reuse, so it is opening a connection
+                connecting = now
+                self.waiting -= 1
+                self._idle.clear()
+                self._time("pool_wait", now - started)
+            elif event_name.endswith("send_request_headers.started") and acquired is None:
+                acquired = now
+                self.in_use += 1
+                if connecting is None:
+                    self.waiting -= 1
+                    self._time("pool_wait", now - started)
+                    if self._idle:
+                        self._idle.pop()
+                else:
+                    self._time("connect", now - connecting)
+            elif event_name == "http11.receive_response_headers.complete":
+                _, _, _, headers = info["return_value"]
+                keep_alive = not any(
+                    name.lower() == b"connection" and b"close" in value.lower() for name, value in headers
+                )
+            elif event_name.endswith("receive_response_body.complete"):
+                body_read = True
+            elif event_name.endswith("response_closed.complete") and acquired is not None and not released:
+                release(reusable=keep_alive and body_read)
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        # Left in place until the response is closed, which is when httpcore
+        # hands the connection back (restore_trace puts the caller's back)
+        request.extensions["trace"] = trace
+        self.waiting += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            if acquired is None and connecting is None:
+                self.waiting -= 1   # failed before the pool gave it a connection
+            if acquired is not None and not released:
+                release(reusable=False)   # httpcore closes a connection that failed
+            elif not released:
+                restore_trace()
+            raise
+        if acquired is None:
+            # answered without the pool (a transport that doesn't trace)
+            if connecting is None:
+                self.waiting -= 1
+            restore_trace()
+        return response
+
+    def _time(self, name, seconds):
+        timing = self._timings[name]
+        timing[0] += 1
+        timing[1] += seconds
+        timing[2] = max(timing[2], seconds)
+
+    def stats(self):
+        """Pool and request statistics, for sizing the pool under load."""
+        # the pool closes connections left idle past keepalive_expiry
+        expired = time.monotonic() - self.config.keepalive_expiry
+        while self._idle and self._idle[0] < expired:
+            self._idle.popleft()
+        stats = {
+            "base_url": self.config.base_url,
+            "connections": {
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "waiting_requests": self.waiting,
+                "max_connections": self.config.max_connections,
+                "max_keepalive": self.config.max_keepalive_connections,
+            },
+            **{
+                f"{name}_ms": {
+                    "count": count,
+                    "avg": total / count * 1000 if count else 0.0,
+                    "max": longest * 1000,
+                }
+                for name, (count, total, longest) in self._timings.items()
+            },
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "circuit": self.breaker.state,
+        }
+        if isinstance(self._transport, ETagCacheTransport):
+            stats["etag_cache"] = self._transport.stats()
+        return stats
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class UpstreamClient(httpx.AsyncClient):
+    """An httpx.AsyncClient that keeps hold of its UpstreamTransport."""
+
+    def __init__(self, upstream, **kwargs):
+        super().__init__(transport=upstream, **kwargs)
+        self.upstream = upstream
+
+    def stats(self):
+        return self.upstream.stats()
+
+
+def create_upstream_client(config=None, spec=None):
+    """Create a tuned httpx.AsyncClient for an upstream API described by ``spec``."""
+    config = config or UpstreamConfig()
+    pool = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        http2=config.http2,
+    )
+    transport = ETagCacheTransport(pool) if config.etag_cache else pool
+    return UpstreamClient(
+        UpstreamTransport(transport, config, spec=spec),
+        base_url=config.base_url,
+        timeout=config.timeout,
+    )
+
+
+def upstream_stats(client):
+    """Statistics for a client made by create_upstream_client."""
+    return client.stats()
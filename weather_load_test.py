@@ -0,0 +1,83 @@
+# python ./weather_load_test.py
+"""
+Load test for the weather tools against a local stand-in upstream.
+
+Each get_current_weather call makes two upstream requests of LATENCY seconds,
+so a server that serializes calls tops out at 1 / (2 * LATENCY) calls per
+second. With non-blocking I/O, throughput should grow with concurrency.
+
+Then, with the stand-in failing every request with 503, it checks that the
+server makes no more upstream calls than the token bucket granted: retries
+must not spend quota the limiter never handed out.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from rate_limiter import TokenBucketLimiter
+from weather_standin import WeatherStandin
+
+LATENCY = 0.05
+CONCURRENCY = [1, 2, 4, 8, 16, 32]
+CALLS_PER_WORKER = 4
+
+
+async def run(client, concurrency, round_no):
+    async def worker(w):
+        for i in range(CALLS_PER_WORKER):
+            # Distinct cities, so every call really goes upstream
+            await client.call_tool("get_current_weather", {"city": f"load-{round_no}-{w}-{i}"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return concurrency * CALLS_PER_WORKER / (time.perf_counter() - start)
+
+
+async def quota_check(client, standin, burst=3, calls=10):
+    """Fail every upstream request and compare upstream calls with tokens granted."""
+    import weather_server
+
+    # Only the burst is available; anything past it is shed straight away.
+    # Kept below the circuit breaker's 5 failures, which would otherwise cap
+    # the upstream requests and hide extra attempts
+    weather_server.upstream_limiter = limiter = TokenBucketLimiter(rate=0.001, burst=burst, max_wait=1.0)
+    standin.fail_status = 503
+    before = sum(standin.requests.values())
+    for i in range(calls):
+        try:
+            await client.call_tool("get_current_weather", {"city": f"quota-{i}"})
+        except Exception:
+            pass   # every call is meant to fail
+    standin.fail_status = None
+    sent = sum(standin.requests.values()) - before
+    print(f"\nupstream failing: {calls} calls, {limiter.admitted} tokens granted, {sent} upstream requests")
+    assert sent <= limiter.admitted <= burst, "upstream requests exceeded the token bucket"
+
+
+async def main():
+    standin = await WeatherStandin(LATENCY).start()
+    os.environ["OPENWEATHER_BASE_URL"] = standin.base_url
+    os.environ.setdefault("OPENWEATHER_API_KEY", "load-test")
+    os.environ["WEATHER_GEOCODE_CACHE"] = ""   # don't persist made-up cities
+    os.environ["WEATHER_RATE_PER_SEC"] = "100000"  # measure the server, not the quota
+    os.environ["WEATHER_RATE_BURST"] = "100000"
+
+    from fastmcp import Client
+    import weather_server
+
+    serial = 1 / (2 * LATENCY)
+    print(f"upstream latency {LATENCY * 1000:.0f} ms, serialized ceiling {serial:.1f} calls/s")
+    print(f"{'concurrency':>11} {'calls/s':>8} {'vs serial':>9}")
+    async with Client(weather_server.mcp) as client:
+        for round_no, concurrency in enumerate(CONCURRENCY):
+            throughput = await run(client, concurrency, round_no)
+            print(f"{concurrency:>11} {throughput:>8.1f} {throughput / serial:>8.1f}x")
+        # failed tool calls are logged with a rich traceback each; keep them quiet
+        logging.getLogger("FastMCP").setLevel(logging.CRITICAL)
+        await quota_check(client, standin)
+    await standin.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,53 +1,245 @@
 # weather_server.py
-from fastmcp import FastMCP
-import os, requests
+import asyncio
+from contextlib import asynccontextmanager
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ToolError
+import json, logging, os, threading, time
 from dotenv import load_dotenv
+from rate_limiter import OverloadedError, TokenBucketLimiter
+from ttl_cache import AsyncTTLCache
+from upstream_client import UpstreamConfig, create_upstream_client
 load_dotenv()
+logger = logging.getLogger(__name__)
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 if not API_KEY:
     raise RuntimeError("Missing OPENWEATHER_API_KEY")
 
-mcp = FastMCP("Weather")
+# One pooled async HTTP client is shared by every tool call, so slow upstream
+# requests never block the event loop and concurrent calls overlap.
+# Point OPENWEATHER_BASE_URL at a stand-in (weather_standin.py) for testing.
+_http = None
+
+def _client():
+    global _http
+    if _http is None:
+        config = UpstreamConfig.from_env(
+            "OPENWEATHER",
+            base_url="https://api.openweathermap.org",
+            timeout=10.0,
+            etag_cache=False,
+        )
+        # Every attempt counts against the API quota, but upstream_limiter
+        # hands out one token per _get_json call, so the client mustn't retry
+        # on its own (not even with OPENWEATHER_RETRIES set)
+        config.retries = 0
+        _http = create_upstream_client(config)
+    return _http
+
+# The lifespan runs once per session (once per SSE connection), but the client
+# is shared by all of them, so it is only closed when the last one ends
+_sessions = 0
+
+@asynccontextmanager
+async def lifespan(server):
+    """Save new geocodes and close the shared HTTP client once no session is using it."""
+    global _http, _sessions
+    _sessions += 1
+    try:
+        yield
+    finally:
+        _sessions -= 1
+        if _sessions == 0:
+            _save_geocodes_now()
+            if _http is not None:
+                http, _http = _http, None
+                await http.aclose()
+
+mcp = FastMCP("Weather", lifespan=lifespan)
+
+# Caches. City coordinates practically never change, so geocodes live for a
+# month and are saved to WEATHER_GEOCODE_CACHE (set it empty to keep them in
+# memory only). Current conditions are refreshed every few minutes.
+# Concurrent misses for the same key share a single upstream request.
+GEOCODE_TTL = float(os.getenv("WEATHER_GEOCODE_TTL", 30 * 24 * 3600))
+CURRENT_TTL = float(os.getenv("WEATHER_CURRENT_TTL", 600))
+GEOCODE_CACHE_PATH = os.getenv("WEATHER_GEOCODE_CACHE", ".weather_geocache.json")
+
+geocode_cache = AsyncTTLCache(GEOCODE_TTL, maxsize=10_000, clock=time.time)
+current_cache = AsyncTTLCache(CURRENT_TTL, maxsize=10_000)
+
+def _load_geocodes():
+    """Fill the geocode cache from disk, if a saved copy exists."""
+    if not GEOCODE_CACHE_PATH:
+        return
+    try:
+        with open(GEOCODE_CACHE_PATH) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    now = time.time()
+    for city, (lat, lon, expires_at) in saved.items():
+        if expires_at > now:
+            geocode_cache.set(city, (lat, lon), expires_at=expires_at)
+
+# New geocodes mark the cache dirty; it is written out (off the event loop)
+# at most once every WEATHER_GEOCODE_SAVE_DELAY seconds, and when the last
+# session ends
+GEOCODE_SAVE_DELAY = float(os.getenv("WEATHER_GEOCODE_SAVE_DELAY", 5))
+_geocodes_dirty = False
+_geocode_save = None         # pending debounced save
+_geocode_write_lock = threading.Lock()
+
+def _write_geocodes(saved):
+    """Write a geocode snapshot to disk, atomically."""
+    with _geocode_write_lock:
+        tmp_path = f"{GEOCODE_CACHE_PATH}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, GEOCODE_CACHE_PATH)
+
+def _geocode_snapshot():
+    global _geocodes_dirty
+    _geocodes_dirty = False
+    return {city: [lat, lon, expires_at] for city, (lat, lon), expires_at in geocode_cache.items()}
+
+async def _save_geocodes_later():
+    """Debounced save: wait, then write the cache from a worker thread."""
+    global _geocodes_dirty
+    await asyncio.sleep(GEOCODE_SAVE_DELAY)
+    if not _geocodes_dirty:
+        return
+    try:
+        await asyncio.to_thread(_write_geocodes, _geocode_snapshot())
+    except OSError as e:
+        _geocodes_dirty = True
+        logger.warning("Could not save geocodes to %s: %s", GEOCODE_CACHE_PATH, e)
+
+def _save_geocodes_now():
+    """Save pending geocodes at shutdown. This blocks, on purpose: the
+    lifespan may already be cancelled, and an awaited write could be cut short."""
+    if _geocode_save is not None:
+        _geocode_save.cancel()
+    if not _geocodes_dirty:
+        return
+    try:
+        _write_geocodes(_geocode_snapshot())
+    except OSError as e:
+        logger.warning("Could not save geocodes to %s: %s", GEOCODE_CACHE_PATH, e)
+
+def _geocodes_changed():
+    global _geocodes_dirty, _geocode_save
+    if not GEOCODE_CACHE_PATH:
+        return
+    _geocodes_dirty = True
+    if _geocode_save is None or _geocode_save.done():
+        _geocode_save = asyncio.create_task(_save_geocodes_later())
+
+_load_geocodes()
+
+# The API key has a hard call quota, so upstream requests (cache misses only)
+# go through a token bucket. Callers queue briefly when it is empty; once the
+# queue is full, or the wait would exceed WEATHER_QUEUE_MAX_WAIT seconds, they
+# get an "overloaded" error straight away.
+upstream_limiter = TokenBucketLimiter(
+    rate=float(os.getenv("WEATHER_RATE_PER_SEC", 1.0)),
+    burst=int(os.getenv("WEATHER_RATE_BURST", 10)),
+    max_queue=int(os.getenv("WEATHER_QUEUE_SIZE", 50)),
+    max_wait=float(os.getenv("WEATHER_QUEUE_MAX_WAIT", 10.0)),
+)
+
+async def _get_json(path: str, params: dict):
+    try:
+        await upstream_limiter.acquire()
+    except OverloadedError as e:
+        raise ToolError(json.dumps(e.as_dict())) from None
+    r = await _client().get(path, params={**params, "appid": API_KEY})
+    r.raise_for_status()
+    return r.json()
+
+async def _fetch_coordinates(city: str) -> tuple:
+    async def fetch():
+        data = await _get_json("/geo/1.0/direct", {"q": city, "limit": 1})
+        if not data:
+            raise ValueError(f"Could not find coordinates for {city}")
+        _geocodes_changed()
+        return data[0]["lat"], data[0]["lon"]
+
+    key = " ".join(city.lower().split())
+    return await geocode_cache.get_or_fetch(key, fetch)
+
+async def _fetch_current_weather(city: str) -> str:
+    # Get coordinates for the city
+    lat, lon = await _fetch_coordinates(city)
+
+    # Make the weather API call (cities sharing coordinates share the entry)
+    async def fetch():
+        data = await _get_json(
+            "/data/3.0/onecall",
+            {
+                "lat": lat,
+                "lon": lon,
+                "exclude": "minutely,hourly,daily,alerts",
+                "units": "metric"
+            },
+        )
+        return data["current"]["weather"][0]["description"], data["current"]["temp"]
+
+    desc, temp = await current_cache.get_or_fetch((lat, lon), fetch)
+    return f"{city}: {desc}, {temp} °C"
 
 @mcp.tool()
 async def get_current_weather(city: str) -> str:
     """Return current weather for a city using One Call API."""
-    # Get coordinates for the city
-    lat, lon = await get_coordinates(city)
-    
-    # Make the weather API call
-    r = requests.get(
-        "https://api.openweathermap.org/data/3.0/onecall",
-        params={
-            "lat": lat, 
-            "lon": lon, 
-            "exclude": "minutely,hourly,daily,alerts", 
-            "appid": API_KEY, 
-            "units": "metric"
-        },
-        timeout=10,
-    )
-    r.raise_for_status()
-    data = r.json()
-    desc = data["current"]["weather"][0]["description"]
-    temp = data["current"]["temp"]
-    return f"{city}: {desc}, {temp} °C"
+    return await _fetch_current_weather(city)
 
 @mcp.tool()
 async def get_coordinates(city: str) -> tuple:
     """Convert city name to latitude and longitude."""
-    r = requests.get(
-        "https://api.openweathermap.org/geo/1.0/direct",
-        params={"q": city, "limit": 1, "appid": API_KEY},
-        timeout=10,
-    )
-    r.raise_for_status()
-    data = r.json()
-    if not data:
-        raise ValueError(f"Could not find coordinates for {city}")
-    lat = data[0]["lat"]
-    lon = data[0]["lon"]
-    return lat, lon
+    return await _fetch_coordinates(city)
+
+# Upper bound on cities fetched at once by get_weather_batch
+BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", 8))
+
+@mcp.tool()
+async def get_weather_batch(cities: list[str], ctx: Context) -> dict:
+    """Return current weather for many cities in one call.
+
+    Cities are fetched concurrently and repeated cities (ignoring case and
+    spacing) only once. Each city gets either a "weather" or an "error"
+    entry, so one unknown city doesn't fail the whole batch.
+    """
+    unique = {}
+    for city in cities:
+        unique.setdefault(" ".join(city.lower().split()), city.strip())
+    names = list(unique.values())
+
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+    results = [None] * len(names)
+    done = 0
+
+    async def fetch(index, city):
+        nonlocal done
+        async with limit:
+            try:
+                results[index] = {"city": city, "weather": await _fetch_current_weather(city)}
+            except Exception as e:
+                results[index] = {"city": city, "error": str(e) or type(e).__name__}
+        done += 1
+        await ctx.report_progress(done, len(names))
+
+    await asyncio.gather(*(fetch(i, city) for i, city in enumerate(names)))
+    failed = sum(1 for result in results if "error" in result)
+    return {"results": results, "succeeded": len(results) - failed, "failed": failed}
+
+@mcp.resource("weather://cache/stats")
+def get_cache_stats() -> dict:
+    """Hit, miss and coalesced-request counters for the weather caches."""
+    return {"geocode": geocode_cache.stats(), "current": current_cache.stats()}
+
+@mcp.resource("weather://limiter/stats")
+def get_limiter_stats() -> dict:
+    """Queue depth, shed counts and wait times for the upstream rate limiter."""
+    return upstream_limiter.stats()
 
 if __name__ == "__main__":
     # Expose as an SSE service on 0.0.0.0:8000/sse
@@ -0,0 +1,114 @@
+# python ./weather_standin.py --port 8081 --latency 0.05
+"""
+A local stand-in for the OpenWeather endpoints used by weather_server.py.
+
+Serves /geo/1.0/direct and /data/3.0/onecall with made-up but stable data
+after a configurable delay, so the weather tools can be load tested offline:
+
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8081 python weather_server.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+DESCRIPTIONS = ["clear sky", "few clouds", "light rain", "overcast clouds", "mist"]
+
+
+class WeatherStandin:
+    """A tiny asyncio HTTP/1.1 server answering like the OpenWeather API."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.requests = {}   # path -> count
+        self.fail_status = None   # set to e.g. 503 to fail every request
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _answer(self, path, params):
+        if self.fail_status is not None:
+            return self.fail_status, {"message": "stand-in failure"}
+        if path == "/geo/1.0/direct":
+            city = params.get("q", [""])[0]
+            if city.lower().startswith("nowhere"):
+                return 200, []
+            digest = hashlib.sha256(city.lower().encode()).digest()
+            lat = round(digest[0] / 255 * 180 - 90, 4)
+            lon = round(digest[1] / 255 * 360 - 180, 4)
+            return 200, [{"name": city, "lat": lat, "lon": lon}]
+        if path == "/data/3.0/onecall":
+            seed = int(hashlib.sha256((params.get("lat", [""])[0] + params.get("lon", [""])[0]).encode()).hexdigest(), 16)
+            return 200, {
+                "current": {
+                    "temp": round(seed % 400 / 10 - 5, 1),
+                    "weather": [{"description": DESCRIPTIONS[seed % len(DESCRIPTIONS)]}],
+                }
+            }
+        return 404, {"message": "not found"}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # Skip headers; requests from the weather tools carry no body
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                url = urlsplit(target)
+                self.requests[url.path] = self.requests.get(url.path, 0) + 1
+                await asyncio.sleep(self.latency)
+
+                status, payload = self._answer(url.path, parse_qs(url.query))
+                body = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # cancelled at shutdown (asyncio.run's cleanup): end quietly, as
+            # asyncio's stream callback logs a traceback for a cancelled
+            # handler on 3.11
+            pass
+        finally:
+            try:
+                writer.close()
+            except ConnectionResetError:
+                pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    args = parser.parse_args()
+
+    standin = await WeatherStandin(args.latency).start(args.host, args.port)
+    print(f"OpenWeather stand-in on {standin.base_url} ({args.latency * 1000:.0f} ms per request)")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())